@@ -1,22 +1,14 @@
+import collections
+import numpy as np
+import candidates as cand
+import tourarray as ta
+import costs
+import fixedpoint as fxp
+
+# shifts of the candidate edge positions covering the 2-opt move and the moves M1-M7 of LSFast
+TWO_OPT_SHIFTS = ((0,0),(-1,-1))
+LS_SHIFTS = ((0,0),(0,-1),(-1,-1))
 
-def CostCalculation(tour,cost_matrix):
-    """
-    FUNCTION: CostCalculation
-     
-    DESCRIPTION:  This fuction calculates the total cost of a route and returns its cost
-    
-    INPUT: (tour)    - List containing the sequence of nodes visited
-           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j 
-    
-    OUTPUT: (tour_cost)      - Total cost of the input tour.
-    """    
-    tour_cost = 0
-    for i in range(len(tour)-1):
-        node_i = tour[i]
-        node_j = tour[i+1]          
-        tour_cost = tour_cost + cost_matrix[node_i][node_j]  
-    return round(tour_cost,2)
-    
 def SwapTwo(tour,i,k):
     """
     FUNCTION: SwapTwo
@@ -56,7 +48,7 @@ def TwoOpt(tour, cost_matrix):
     """    
     tour = tour[1:-1]
     size = len(tour) #length of the tour
-    best_cost = CostCalculation([0]+tour+[0],cost_matrix)
+    best_cost = round(costs.CostCalculation([0]+tour+[0],cost_matrix),2)
     improve = 0 #auxiliary variable that stops the algorithm if no improvement is found
     while(improve <= 1):
         
@@ -64,7 +56,7 @@ def TwoOpt(tour, cost_matrix):
 
             for k in range(i+1,size): # the depot (0) is not considered for swapping
                 new_tour = SwapTwo(tour,i,k)   
-                new_cost = CostCalculation([0]+new_tour+[0],cost_matrix)
+                new_cost = round(costs.CostCalculation([0]+new_tour+[0],cost_matrix),2)
                 if (new_cost < best_cost):
 
                     tour = new_tour
@@ -78,10 +70,11 @@ def TwoOpt(tour, cost_matrix):
     
 def SwapTwoFast(tour,i,k):
     """
-    FUNCTION: SwapTwo
+    FUNCTION: SwapTwoFast
      
-    DESCRIPTION:  This fuction recreates a tour swaping nodes in positions i and k. 
-    The functions breaks the tour in the position i-1, reconnects the position i-1 with position k and inverts the central tour to reconnect position i with k+1.  
+    DESCRIPTION:  This fuction swaps two edges of a tour in place, reversing the nodes in positions i+1 to k. 
+    The functions breaks the tour after the position i, reconnects the position i with position k and inverts the central tour to reconnect position i+1 with k+1.  
+    The cost is O(k-i), no new tour is created.
     
     INPUT: (tour)      - List containing the sequence of nodes visited
            (i)         - Position of the first node in the list
@@ -89,157 +82,551 @@ def SwapTwoFast(tour,i,k):
                
            
            
-    OUTPUT: (new_tour)   - New tour recreated.
+    OUTPUT: (tour)   - The input tour, modified.
     """ 
     
-    first_route = tour[0:i+1]
-    second_route = tour[i+1:k+1][::-1]
-    third_route = tour[k+1:] 
-    new_tour = list()
-    new_tour = first_route + second_route + third_route
-            
-    return new_tour
+    tour[i+1:k+1] = tour[k:i:-1]
+    return tour
 
 
     
-def TwoOptFast(tour,dist):
+def TwoOptFast(tour,dist,candidates = None,stats = None,asymmetric = False):
+    """
+    FUNCTION: TwoOptFast
+     
+    DESCRIPTION:  This function applies the 2-opt algorithm (best improvement) computing the change of each move from the four edges involved.
+    If candidate lists are given, only the moves adding a candidate edge are evaluated, so each pass is O(n.k) instead of O(n^2).
+    On asymmetric cost matrices the reversed path also changes cost; with asymmetric = True the change includes it in O(1) from the prefix costs of the tour (tourarray.PathCosts).
+    
+    INPUT: (tour)       - List containing the sequence of nodes visited
+           (dist)       - Cost matrix (full) with the associated cost of moving from node i to node j 
+           (candidates) - Candidate lists given by candidates.CandidateLists (default = None, all the pairs are evaluated)
+           (stats)      - Dictionary where the number of moves evaluated ('evaluated') and applied ('applied') are accumulated (default = None)
+           (asymmetric) - Boolean to compute exact changes on asymmetric cost matrices (default = False)
+    
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
+    tour = list(tour)
     size = len(tour) #length of the tour
+    exact = fxp.IsFixedPoint(dist)
+    evaluated = 0
+    applied = 0
+    if asymmetric:
+        forward,backward = ta.PathCosts(tour,dist)
+    if candidates is None:
+        pairs = [(i,j) for i in range(0,size-2) for j in range(i+2,size-1)]
     while True: 
+        if candidates is not None:
+            pairs = cand.CandidatePairs(tour,candidates,TWO_OPT_SHIFTS,0,2)
         minchange = 0
-        for i in range(0,size-2):
-            for j in range(i+2,size-1):
-                 change = dist[tour[i]][tour[j]] + dist[tour[i+1]][tour[j+1]]- dist[tour[i]][tour[i+1]] - dist[tour[j]][tour[j+1]]
-                 
-                 if minchange > change:
-                     
-                     
-                     minchange = change
-                     mini = i
-                     minj = j
-        if (minchange >= 0): break              
-        tour = SwapTwoFast(tour, mini,minj)
+        for i,j in pairs:
+            change = dist[tour[i]][tour[j]] + dist[tour[i+1]][tour[j+1]]- dist[tour[i]][tour[i+1]] - dist[tour[j]][tour[j+1]]
+            if asymmetric:
+                change = change + ((backward[j]-backward[i+1]) - (forward[j]-forward[i+1]))
+            
+            if minchange > (change if exact else round(change,2)):
+                
                 
-    return tour,CostCalculation(tour,dist)
+                minchange = change
+                mini = i
+                minj = j
+        evaluated += len(pairs)
+        if (minchange >= 0): break              
+        SwapTwoFast(tour, mini,minj)
+        if asymmetric:
+            ta.UpdatePathCosts(forward,backward,tour,dist,mini+1)
+        applied += 1
+    
+    if stats is not None:
+        stats['evaluated'] = stats.get('evaluated',0) + evaluated
+        stats['applied'] = stats.get('applied',0) + applied
+    return tour,round(costs.CostCalculation(tour,dist),2)
 
 
-def LSFast(tour,tour_cost,cost_matrix):
+def TwoOptFirst(tour,dist,candidates = None,stats = None):
+    """
+    FUNCTION: TwoOptFirst
+     
+    DESCRIPTION:  This function applies the 2-opt algorithm with first improvement and don't-look bits. 
+    A queue holds the "dirty" nodes, initially all of them. A node is taken from the queue and the 2-opt moves removing one of its two tour edges are evaluated;
+    the first improving move is applied and the four endpoints of the removed edges are queued again. If no move improves, the node stays out of the queue (don't-look bit set).
+    The algorithm stops when the queue is empty, so after the first pass only the nodes touched by the last moves are re-checked.
+    The tour is kept as a tourarray (cycle and node positions) and each move reverses the shorter side of the cycle in place, which assumes a symmetric cost matrix.
+    
+    INPUT: (tour)       - List containing the sequence of nodes visited
+           (dist)       - Cost matrix (full) with the associated cost of moving from node i to node j 
+           (candidates) - Candidate lists given by candidates.CandidateLists (default = None, all the nodes are tried)
+           (stats)      - Dictionary where the number of moves evaluated ('evaluated') and applied ('applied') are accumulated (default = None)
+    
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
+    order,position = ta.TourArray(tour)
+    queue = collections.deque(order)
+    queued = [True]*len(order)
+    exact = fxp.IsFixedPoint(dist)
+    evaluated = 0
+    applied = 0
+    
+    while queue:
+        u = queue.popleft()
+        queued[u] = False
+        if candidates is None:
+            neighbours = order
+        else:
+            neighbours = candidates[u]
+        improved = False
+        # removing the edge after u (a=u) or before u (b=u), together with the edge after v or before v
+        for succ in (True,False):
+            if succ:
+                a = u
+                b = ta.Next(order,position,u)
+            else:
+                a = ta.Prev(order,position,u)
+                b = u
+            for v in neighbours:
+                if succ:
+                    c = v
+                    d = ta.Next(order,position,v)
+                else:
+                    c = ta.Prev(order,position,v)
+                    d = v
+                if c == a or c == b or d == a:
+                    continue
+                evaluated += 1
+                change = dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+                if (change if exact else round(change,2)) < 0:
+                    improved = True
+                    break
+            if improved: break
+        
+        if improved:
+            # ... a b ... c d ... becomes ... a c ... b d ...
+            ta.Reverse(order,position,b,c,True)
+            for node in (a,b,c,d,u):
+                if not queued[node]:
+                    queue.append(node)
+                    queued[node] = True
+            applied += 1
+    
+    tour = ta.TourList(order,position)
+    if stats is not None:
+        stats['evaluated'] = stats.get('evaluated',0) + evaluated
+        stats['applied'] = stats.get('applied',0) + applied
+    return tour,round(costs.CostCalculation(tour,dist),2)
+
+
+def LSApplyMove(tour,mini,minj,mint):
+    """
+    FUNCTION: LSApplyMove
+     
+    DESCRIPTION:  This function applies in place one of the seven LS moves (M1-M7) evaluated by LSFast to a tour.
+    Only the positions mini to minj+1 are rewritten, so the cost is O(minj-mini) and no new tour is created.
+    
+    INPUT: (tour)      - List containing the sequence of nodes visited
+           (mini)      - Position of the first node in the list
+           (minj)      - Position of the second node in the list
+           (mint)      - Type of the move (1 to 7)
+    
+    OUTPUT: (tour) - The input tour, modified.
+    """
+    if mint == 1:
+        # node mini is moved after node minj
+        aux = tour[mini]
+        tour[mini:minj] = tour[mini+1:minj+1]
+        tour[minj] = aux
+    elif mint == 2 or mint == 3:
+        # nodes mini and mini+1 are moved after node minj (M3 reverses them)
+        aux_1 = tour[mini]
+        aux_2 = tour[mini+1]
+        tour[mini:minj-1] = tour[mini+2:minj+1]
+        if mint == 2:
+            tour[minj-1] = aux_1
+            tour[minj] = aux_2
+        else:
+            tour[minj-1] = aux_2
+            tour[minj] = aux_1
+    elif mint == 4:
+        aux = tour[mini]
+        tour[mini] = tour[minj]
+        tour[minj] = aux
+    elif mint == 5:
+        # node minj takes the place of nodes mini and mini+1, which are moved before node minj+1
+        aux_1 = tour[mini]
+        aux_2 = tour[mini+1]
+        aux = tour[minj]
+        tour[mini+1:minj-1] = tour[mini+2:minj]
+        tour[mini] = aux
+        tour[minj-1] = aux_1
+        tour[minj] = aux_2
+    elif mint == 6:
+        aux = tour[mini]
+        tour[mini] = tour[minj]
+        tour[minj] = aux
+                                
+        aux = tour[mini+1]
+        tour[mini+1] = tour[minj+1]
+        tour[minj+1] = aux
+            
+    elif mint == 7:
+        SwapTwoFast(tour,mini,minj)
+    return tour
+
+
+def LSFast(tour,tour_cost,cost_matrix,candidates = None,asymmetric = False):
+    """
+    FUNCTION: LSFast
+     
+    DESCRIPTION:  This function applies a local search (best improvement) with seven moves for every pair of positions (i,j):
+    relocation of a node or of a pair of nodes (M1, M2, M3), swaps (M4, M5, M6) and 2-opt (M7).
+    If candidate lists are given, only the pairs whose moves add a candidate edge are evaluated, so each pass is O(n.k) instead of O(n^2).
+    On asymmetric cost matrices, asymmetric = True makes the changes exact: the edges of the moved pair (M2, M3) are taken in the direction they are travelled,
+    and the cost change of the reversed path (M7), pair (M3) or adjacent nodes (M4) is added in O(1) from the prefix costs of the tour (tourarray.PathCosts), 
+    which are refreshed after each applied move.
+    
+    INPUT: (tour)        - List containing the sequence of nodes visited
+           (tour_cost)   - Cost of the input tour
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j 
+           (candidates)  - Candidate lists given by candidates.CandidateLists (default = None, all the pairs are evaluated)
+           (asymmetric)  - Boolean to compute exact changes on asymmetric cost matrices (default = False)
+    
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
 #    print "LS"
+    tour = list(tour)
     size = len(tour) #length of the tour
+    exact = fxp.IsFixedPoint(cost_matrix)
+    if candidates is None:
+        pairs = [(i,j) for i in range(1,size-1) for j in range(i+1,size-1)]
+    if asymmetric:
+        forward,backward = ta.PathCosts(tour,cost_matrix)
     
     while (True):
+        if candidates is not None:
+            pairs = cand.CandidatePairs(tour,candidates,LS_SHIFTS,1,1)
         minchange = 0
-        for i in range(1,size-1):
-            for j in range(i+1,size-1): 
-                
-                change_M1 = 0
-                change_M2 = 0
-                change_M3 = 0
-                change_M4 = 0
-                change_M5 = 0
-                change_M6 = 0
-                change_M7 = 0
-                                
-                change_M1 = cost_matrix[tour[i-1]][tour[i+1]] + cost_matrix[tour[j]][tour[i]] + cost_matrix[tour[i]][tour[j+1]] - cost_matrix[tour[j]][tour[j+1]] - cost_matrix[tour[i]][tour[i+1]] - cost_matrix[tour[i-1]][tour[i]]     
-        
-         
-                if j >= i+2:
-                   change_M2 = cost_matrix[tour[i-1]][tour[i+2]] + cost_matrix[tour[j]][tour[i]] + cost_matrix[tour[j+1]][tour[i+1]] - cost_matrix[tour[i+1]][tour[i+2]] - cost_matrix[tour[i-1]][tour[i]] - cost_matrix[tour[j]][tour[j+1]]
+        for i,j in pairs:
+            
+            change_M1 = 0
+            change_M2 = 0
+            change_M3 = 0
+            change_M4 = 0
+            change_M5 = 0
+            change_M6 = 0
+            change_M7 = 0
+                            
+            change_M1 = cost_matrix[tour[i-1]][tour[i+1]] + cost_matrix[tour[j]][tour[i]] + cost_matrix[tour[i]][tour[j+1]] - cost_matrix[tour[j]][tour[j+1]] - cost_matrix[tour[i]][tour[i+1]] - cost_matrix[tour[i-1]][tour[i]]     
+    
+     
+            if j >= i+2:
+               change_M2 = cost_matrix[tour[i-1]][tour[i+2]] + cost_matrix[tour[j]][tour[i]] + cost_matrix[tour[j+1]][tour[i+1]] - cost_matrix[tour[i+1]][tour[i+2]] - cost_matrix[tour[i-1]][tour[i]] - cost_matrix[tour[j]][tour[j+1]]
 
+    
+            if j >= i+2:
+                change_M3 = cost_matrix[tour[i-1]][tour[i+2]] + cost_matrix[tour[j]][tour[i+1]] + cost_matrix[tour[j+1]][tour[i]] - cost_matrix[tour[i+1]][tour[i+2]] - cost_matrix[tour[i-1]][tour[i]] - cost_matrix[tour[j]][tour[j+1]]
+            
+            if i+1 != j:
+               enter_M4 = cost_matrix[tour[i-1]][tour[j]] + cost_matrix[tour[j]][tour[i+1]] + cost_matrix[tour[j-1]][tour[i]]  + cost_matrix[tour[i]][tour[j+1]]           
+               leave_M4 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i]][tour[i+1]] +cost_matrix[tour[j]][tour[j+1]]+cost_matrix[tour[j-1]][tour[j]]
+               change_M4 = enter_M4 - leave_M4
+            else:
+               enter_M4 = cost_matrix[tour[i-1]][tour[j]]  + cost_matrix[tour[i]][tour[j+1]]
+               leave_M4 = cost_matrix[tour[i-1]][tour[i]] +  cost_matrix[tour[j]][tour[j+1]]
+               change_M4 = enter_M4 - leave_M4
+            if  j > i+1:
+               if j == i+2:
+                   enter_M5 = cost_matrix[tour[i-1]][tour[j]] + cost_matrix[tour[j]][tour[i]] + cost_matrix[tour[i+1]][tour[j+1]]             
+                   leave_M5 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]] +cost_matrix[tour[j]][tour[j+1]]
+                   change_M5 = enter_M5 - leave_M5
+               else:
+                   enter_M5 = cost_matrix[tour[i-1]][tour[j]] + cost_matrix[tour[j]][tour[i+2]] + cost_matrix[tour[j-1]][tour[i]]  + cost_matrix[tour[i+1]][tour[j+1]]           
+                   leave_M5 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]] +cost_matrix[tour[j]][tour[j+1]]+cost_matrix[tour[j-1]][tour[j]]
+                   change_M5 = enter_M5 - leave_M5
+                   
+            if j < size-2 and j >= i+2:                   
+               if  j == i+2:
+                   enter_M6 = cost_matrix[tour[j+1]][tour[i]] +  cost_matrix[tour[i+1]][tour[j+2]]+ cost_matrix[tour[i-1]][tour[j]]     
+                   leave_M6 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]]+cost_matrix[tour[j+1]][tour[j+2]]
+                   change_M6 = enter_M6 - leave_M6
+               else:           
+                   enter_M6 = cost_matrix[tour[i-1]][tour[j]] +cost_matrix[tour[j+1]][tour[i+2]] + cost_matrix[tour[j-1]][tour[i]] + cost_matrix[tour[i+1]][tour[j+2]] 
+                   leave_M6 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]] + cost_matrix[tour[j-1]][tour[j]] + cost_matrix[tour[j+1]][tour[j+2]]
+                   change_M6 = enter_M6 - leave_M6
+            
+            change_M7 = cost_matrix[tour[i]][tour[j]] + cost_matrix[tour[i+1]][tour[j+1]]- cost_matrix[tour[i]][tour[i+1]] - cost_matrix[tour[j]][tour[j+1]]
         
+            if asymmetric:
+                # the moved pair is entered and left in the other direction, the reversed pair (M3) and the swapped neighbours (M4) change direction
                 if j >= i+2:
-                    change_M3 = cost_matrix[tour[i-1]][tour[i+2]] + cost_matrix[tour[j]][tour[i+1]] + cost_matrix[tour[j+1]][tour[i]] - cost_matrix[tour[i+1]][tour[i+2]] - cost_matrix[tour[i-1]][tour[i]] - cost_matrix[tour[j]][tour[j+1]]
-                
-                if i+1 != j:
-                   enter_M4 = cost_matrix[tour[i-1]][tour[j]] + cost_matrix[tour[j]][tour[i+1]] + cost_matrix[tour[j-1]][tour[i]]  + cost_matrix[tour[i]][tour[j+1]]           
-                   leave_M4 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i]][tour[i+1]] +cost_matrix[tour[j]][tour[j+1]]+cost_matrix[tour[j-1]][tour[j]]
-                   change_M4 = enter_M4 - leave_M4
+                    change_M2 = change_M2 + (cost_matrix[tour[i+1]][tour[j+1]] - cost_matrix[tour[j+1]][tour[i+1]])
+                    change_M3 = change_M3 + (cost_matrix[tour[i]][tour[j+1]] - cost_matrix[tour[j+1]][tour[i]]) + ((backward[i+1]-backward[i]) - (forward[i+1]-forward[i]))
                 else:
-                   enter_M4 = cost_matrix[tour[i-1]][tour[j]]  + cost_matrix[tour[i]][tour[j+1]]
-                   leave_M4 = cost_matrix[tour[i-1]][tour[i]] +  cost_matrix[tour[j]][tour[j+1]]
-                   change_M4 = enter_M4 - leave_M4
-                if  j > i+1:
-                   if j == i+2:
-                       enter_M5 = cost_matrix[tour[i-1]][tour[j]] + cost_matrix[tour[j]][tour[i]] + cost_matrix[tour[i+1]][tour[j+1]]             
-                       leave_M5 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]] +cost_matrix[tour[j]][tour[j+1]]
-                       change_M5 = enter_M5 - leave_M5
-                   else:
-                       enter_M5 = cost_matrix[tour[i-1]][tour[j]] + cost_matrix[tour[j]][tour[i+2]] + cost_matrix[tour[j-1]][tour[i]]  + cost_matrix[tour[i+1]][tour[j+1]]           
-                       leave_M5 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]] +cost_matrix[tour[j]][tour[j+1]]+cost_matrix[tour[j-1]][tour[j]]
-                       change_M5 = enter_M5 - leave_M5
-                       
-                if j < size-2 and j >= i+2:                   
-                   if  j == i+2:
-                       enter_M6 = cost_matrix[tour[j+1]][tour[i]] +  cost_matrix[tour[i+1]][tour[j+2]]+ cost_matrix[tour[i-1]][tour[j]]     
-                       leave_M6 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]]+cost_matrix[tour[j+1]][tour[j+2]]
-                       change_M6 = enter_M6 - leave_M6
-                   else:           
-                       enter_M6 = cost_matrix[tour[i-1]][tour[j]] +cost_matrix[tour[j+1]][tour[i+2]] + cost_matrix[tour[j-1]][tour[i]] + cost_matrix[tour[i+1]][tour[j+2]] 
-                       leave_M6 = cost_matrix[tour[i-1]][tour[i]] + cost_matrix[tour[i+1]][tour[i+2]] + cost_matrix[tour[j-1]][tour[j]] + cost_matrix[tour[j+1]][tour[j+2]]
-                       change_M6 = enter_M6 - leave_M6
-                
-                change_M7 = cost_matrix[tour[i]][tour[j]] + cost_matrix[tour[i+1]][tour[j+1]]- cost_matrix[tour[i]][tour[i+1]] - cost_matrix[tour[j]][tour[j+1]]
-        
-                change = min(change_M1,change_M2,change_M3,change_M4,change_M5,change_M6,change_M7)
-                
-                if change == change_M1:
-                    t = 1
-                elif change == change_M2:
-                    t = 2
-                elif change == change_M3:
-                    t = 3
-                elif change == change_M4:
-                    t = 4
-                elif change == change_M5:
-                    t = 5
-                elif change == change_M6:
-                    t = 6
-                elif change == change_M7:
-                    t = 7
-         
-                if minchange > round(change,2):
+                    change_M4 = change_M4 + ((backward[j]-backward[i]) - (forward[j]-forward[i]))
+                change_M7 = change_M7 + ((backward[j]-backward[i+1]) - (forward[j]-forward[i+1]))
+
+            change = min(change_M1,change_M2,change_M3,change_M4,change_M5,change_M6,change_M7)
+            
+            if change == change_M1:
+                t = 1
+            elif change == change_M2:
+                t = 2
+            elif change == change_M3:
+                t = 3
+            elif change == change_M4:
+                t = 4
+            elif change == change_M5:
+                t = 5
+            elif change == change_M6:
+                t = 6
+            elif change == change_M7:
+                t = 7
+     
+            if minchange > (change if exact else round(change,2)):
 #                    print "pure:",change
 #                    print "round:",round(change,2)
-                    minchange = change
-                    mini = i
-                    minj = j
-                    mint = t
-                  
-                    
-        if (minchange >= 0): break         
-        if mint == 1:
-            new_tour = tour[:mini] + tour[mini+1:minj+1] +[tour[mini]]+ tour[minj+1:]
-            tour = new_tour
-        elif mint == 2:
-            new_tour = tour[:mini] +tour[mini+2:minj+1]+[tour[mini],tour[mini+1]]+ tour[minj+1:]
-            tour = new_tour
-        elif mint == 3:
-            new_tour = tour[:mini] +tour[mini+2:minj+1]+[tour[mini+1],tour[mini]]+ tour[minj+1:]
-            tour = new_tour    
-        elif mint == 4:
-            new_tour = list(tour)
-            aux = new_tour[mini]
-            new_tour[mini] = new_tour[minj]
-            new_tour[minj] = aux
-            
-            tour = new_tour
-        elif mint == 5:
-            new_tour = tour[:mini]+[tour[minj]]+ tour[mini+2:minj]+tour[mini:mini+2]+tour[minj+1:]
-            tour = new_tour
-        elif mint == 6:
-            new_tour = list(tour)
-            aux = new_tour[mini]
-            new_tour[mini] = new_tour[minj]
-            new_tour[minj] = aux
-                                    
-            aux = new_tour[mini+1]
-            new_tour[mini+1] = new_tour[minj+1]
-            new_tour[minj+1] = aux
-            
-            tour = new_tour
+                minchange = change
+                mini = i
+                minj = j
+                mint = t
+              
                 
-        elif mint == 7:
-            new_tour = SwapTwoFast(tour,mini,minj)
-            tour = new_tour
+        if (minchange >= 0): break         
+        LSApplyMove(tour,mini,minj,mint)
+        if asymmetric:
+            ta.UpdatePathCosts(forward,backward,tour,cost_matrix,mini)
         tour_cost = tour_cost + minchange
 #    print "LS Done"        
     return tour,tour_cost   
+
+
+def LSMoveDeltas(D,i,j,paths = None):
+    """
+    FUNCTION: LSMoveDeltas
+     
+    DESCRIPTION:  This function evaluates the seven LS moves (M1-M7) of LSFast for many pairs of positions (i,j) in one batched NumPy pass.
+    The formulas and the order of the operations are the same as in LSFast, so the deltas are bitwise identical to the ones computed in the Python loop.
+    Pairs with j <= i are not valid moves and receive an infinite delta.
+    
+    INPUT: (D)      - Cost matrix permuted by the tour, D[a][b] = cost_matrix[tour[a]][tour[b]], padded with one extra row and column
+           (i)      - np.array with the positions i to be evaluated
+           (j)      - np.array with the positions j to be evaluated, broadcastable against i (e.g. a column and a row for all pairs)
+           (paths)  - Tuple of np.arrays (forward,backward) with the prefix costs of the tour, to compute exact changes on asymmetric matrices as LSFast (default = None)
+    
+    OUTPUT: (change) - np.array with the best delta of each pair
+            (which)  - np.array with the type (1 to 7) of the best move of each pair
+    """
+    size = D.shape[0]-1 #length of the tour
+    zero = np.zeros(np.broadcast(i,j).shape)
+    
+    change_M1 = D[i-1,i+1] + D[j,i] + D[i,j+1] - D[j,j+1] - D[i,i+1] - D[i-1,i]
+    
+    change_M2 = np.where(j >= i+2, D[i-1,i+2] + D[j,i] + D[j+1,i+1] - D[i+1,i+2] - D[i-1,i] - D[j,j+1], zero)
+    
+    change_M3 = np.where(j >= i+2, D[i-1,i+2] + D[j,i+1] + D[j+1,i] - D[i+1,i+2] - D[i-1,i] - D[j,j+1], zero)
+    
+    enter_M4 = D[i-1,j] + D[j,i+1] + D[j-1,i] + D[i,j+1]
+    leave_M4 = D[i-1,i] + D[i,i+1] + D[j,j+1] + D[j-1,j]
+    enter_M4_adj = D[i-1,j] + D[i,j+1]
+    leave_M4_adj = D[i-1,i] + D[j,j+1]
+    change_M4 = np.where(j != i+1, enter_M4 - leave_M4, enter_M4_adj - leave_M4_adj)
+    
+    enter_M5 = D[i-1,j] + D[j,i+2] + D[j-1,i] + D[i+1,j+1]
+    leave_M5 = D[i-1,i] + D[i+1,i+2] + D[j,j+1] + D[j-1,j]
+    enter_M5_adj = D[i-1,j] + D[j,i] + D[i+1,j+1]
+    leave_M5_adj = D[i-1,i] + D[i+1,i+2] + D[j,j+1]
+    change_M5 = np.where(j == i+2, enter_M5_adj - leave_M5_adj, enter_M5 - leave_M5)
+    change_M5 = np.where(j > i+1, change_M5, zero)
+    
+    enter_M6 = D[i-1,j] + D[j+1,i+2] + D[j-1,i] + D[i+1,j+2]
+    leave_M6 = D[i-1,i] + D[i+1,i+2] + D[j-1,j] + D[j+1,j+2]
+    enter_M6_adj = D[j+1,i] + D[i+1,j+2] + D[i-1,j]
+    leave_M6_adj = D[i-1,i] + D[i+1,i+2] + D[j+1,j+2]
+    change_M6 = np.where(j == i+2, enter_M6_adj - leave_M6_adj, enter_M6 - leave_M6)
+    change_M6 = np.where((j < size-2) & (j >= i+2), change_M6, zero)
+    
+    change_M7 = D[i,j] + D[i+1,j+1] - D[i,i+1] - D[j,j+1]
+    
+    if paths is not None:
+        forward,backward = paths
+        change_M2 = np.where(j >= i+2, change_M2 + (D[i+1,j+1] - D[j+1,i+1]), zero)
+        change_M3 = np.where(j >= i+2, change_M3 + (D[i,j+1] - D[j+1,i]) + ((backward[i+1]-backward[i]) - (forward[i+1]-forward[i])), zero)
+        change_M4 = np.where(j != i+1, change_M4, change_M4 + ((backward[j]-backward[i]) - (forward[j]-forward[i])))
+        change_M7 = change_M7 + ((backward[j]-backward[i+1]) - (forward[j]-forward[i+1]))
+    
+    moves = np.array([change_M1,change_M2,change_M3,change_M4,change_M5,change_M6,change_M7])
+    which = np.argmin(moves,axis=0) + 1
+    change = np.min(moves,axis=0)
+    change[np.broadcast_to(j <= i,change.shape)] = np.inf
+    return change,which
+
+
+def LSSelectMove(change):
+    """
+    FUNCTION: LSSelectMove
+     
+    DESCRIPTION:  This function selects the move LSFast would apply given a matrix of deltas. 
+    LSFast accepts a pair when its delta, rounded to 2 decimals, is strictly lower than the (unrounded) best delta found so far, scanning i then j.
+    The first pair with the lowest rounded delta is therefore always accepted, and the following ties are accepted while the current best is above the rounded value.
+    
+    INPUT: (change) - np.array with the delta of each pair (i,j)
+    
+    OUTPUT: (index) - Flat index of the selected pair in change, or None if there is no improving move.
+    """
+    if change.size == 0:
+        return None
+    rounded = np.round(change,2)
+    best = rounded.min()
+    if not best < 0:
+        return None
+    flat = change.ravel()
+    for index in np.flatnonzero(rounded.ravel() == best):
+        if flat[index] <= best:
+            break
+    return index
+
+
+def LSPathCosts(D,size):
+    """
+    FUNCTION: LSPathCosts
+     
+    DESCRIPTION:  This function computes the forward and backward prefix costs of a tour (as tourarray.PathCosts) from the cost matrix permuted by the tour.
+    
+    INPUT: (D)      - Cost matrix permuted by the tour, D[a][b] = cost_matrix[tour[a]][tour[b]]
+           (size)   - Length of the tour
+    
+    OUTPUT: (forward,backward) - np.arrays with the prefix costs of the tour.
+    """
+    steps = np.arange(size-1)
+    forward = np.concatenate(([0.0],np.cumsum(D[steps,steps+1])))
+    backward = np.concatenate(([0.0],np.cumsum(D[steps+1,steps])))
+    return forward,backward
+
+
+def LSFastVectorized(tour,tour_cost,cost_matrix,candidates = None,asymmetric = False):
+    """
+    FUNCTION: LSFastVectorized
+     
+    DESCRIPTION:  This function applies the same local search as LSFast (moves M1-M7, best improvement) but the deltas of all pairs (i,j)
+    are computed at once by LSMoveDeltas on the cost matrix permuted by the current tour. It returns the same tour and cost as LSFast for the same input.
+    
+    INPUT: (tour)        - List containing the sequence of nodes visited
+           (tour_cost)   - Cost of the input tour
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j. A np.array avoids one conversion per call
+           (candidates)  - Candidate lists given by candidates.CandidateLists (default = None, all the pairs are evaluated)
+           (asymmetric)  - Boolean to compute exact changes on asymmetric cost matrices (default = False)
+    
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
+    tour = list(tour)
+    size = len(tour) #length of the tour
+    cost_matrix = np.asarray(cost_matrix,dtype='float64')
+    paths = None
+    positions = np.arange(1,size-1)
+    I = positions[:,None]
+    J = positions[None,:]
+    D = np.zeros((size+1,size+1))
+    
+    while (True):
+        nodes = np.array(tour)
+        D[:size,:size] = cost_matrix[nodes[:,None],nodes[None,:]]
+        if asymmetric:
+            paths = LSPathCosts(D,size)
+        if candidates is not None:
+            pairs = np.array(cand.CandidatePairs(tour,candidates,LS_SHIFTS,1,1),dtype=int).reshape(-1,2)
+            I = pairs[:,0]
+            J = pairs[:,1]
+        change,which = LSMoveDeltas(D,I,J,paths)
+        index = LSSelectMove(change)
+        if index is None: break
+        index = np.unravel_index(index,change.shape)
+        mini = int(np.broadcast_to(I,change.shape)[index])
+        minj = int(np.broadcast_to(J,change.shape)[index])
+        minchange = float(change[index])
+        LSApplyMove(tour,mini,minj,int(which[index]))
+        tour_cost = tour_cost + minchange
+    return tour,tour_cost
+
+
+def LSFastIncremental(tour,tour_cost,cost_matrix,asymmetric = False):
+    """
+    FUNCTION: LSFastIncremental
+     
+    DESCRIPTION:  This function applies the same local search as LSFast (moves M1-M7, best improvement) and returns the same tour and cost,
+    but keeps the table of the deltas of all pairs (i,j) between iterations. After a move rewrites the positions lo to hi, only the rows and columns
+    of the pairs whose moves read one of these positions (i or j in lo-2..hi+1) are recomputed by LSMoveDeltas.
+    The best rounded delta of each row is kept (a one level tournament), so the next move is found in O(n) from the row minima instead of a full sweep.
+    A local search costs one full evaluation plus O(n.(hi-lo)) per applied move.
+    On asymmetric matrices the prefix costs after position lo change with every move, and with them the deltas of every pair (M7 reads them),
+    so there is nothing to keep between iterations: asymmetric = True runs LSFastVectorized.
+    
+    INPUT: (tour)        - List containing the sequence of nodes visited
+           (tour_cost)   - Cost of the input tour
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j. A np.array avoids one conversion per call
+           (asymmetric)  - Boolean to compute exact changes on asymmetric cost matrices (default = False)
+    
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
+    if asymmetric:
+        return LSFastVectorized(tour,tour_cost,cost_matrix,None,True)
+    tour = list(tour)
+    size = len(tour) #length of the tour
+    if size < 4:
+        return tour,tour_cost
+    cost_matrix = np.asarray(cost_matrix,dtype='float64')
+    nodes = np.array(tour)
+    positions = np.arange(1,size-1) # row and column r of the table are the position r+1
+    D = np.zeros((size+1,size+1))
+    D[:size,:size] = cost_matrix[nodes[:,None],nodes[None,:]]
+    
+    change,which = LSMoveDeltas(D,positions[:,None],positions[None,:])
+    rounded = np.round(change,2)
+    row_best = rounded.min(axis=1)
+    row_arg = rounded.argmin(axis=1)
+    
+    while (True):
+        best = row_best.min()
+        if not best < 0: break
+        # same choice as LSSelectMove, scanning only the rows holding the best rounded delta
+        for row in np.flatnonzero(row_best == best):
+            for col in np.flatnonzero(rounded[row] == best):
+                if change[row,col] <= best: break
+            else:
+                continue
+            break
+        mini = int(positions[row])
+        minj = int(positions[col])
+        tour_cost = tour_cost + float(change[row,col])
+        LSApplyMove(tour,mini,minj,int(which[row,col]))
+        
+        # positions mini..minj+1 may have changed
+        lo = mini
+        hi = min(minj+1,size-2)
+        nodes[lo:hi+1] = tour[lo:hi+1]
+        D[lo:hi+1,:size] = cost_matrix[nodes[lo:hi+1,None],nodes[None,:]]
+        D[:size,lo:hi+1] = cost_matrix[nodes[:,None],nodes[None,lo:hi+1]]
+        
+        # table rows and columns of the pairs reading a changed position
+        start = max(lo-2,1)-1
+        stop = min(hi+1,size-2)
+        # (only the pairs j > i are valid, the others keep their infinite delta)
+        change[start:stop,start:],which[start:stop,start:] = LSMoveDeltas(D,positions[start:stop,None],positions[None,start:])
+        change[:start,start:stop],which[:start,start:stop] = LSMoveDeltas(D,positions[:start,None],positions[None,start:stop])
+        rounded[start:stop,start:] = np.round(change[start:stop,start:],2)
+        rounded[:start,start:stop] = np.round(change[:start,start:stop],2)
+        
+        # row minima: full update of the rows whose minimum may have increased, block update of the others
+        full = (row_arg >= start) & (row_arg < stop)
+        full[start:stop] = True
+        block_best = rounded[:,start:stop].min(axis=1)
+        block_arg = rounded[:,start:stop].argmin(axis=1) + start
+        better = ~full & ((block_best < row_best) | ((block_best == row_best) & (block_arg < row_arg)))
+        row_best[better] = block_best[better]
+        row_arg[better] = block_arg[better]
+        rows = np.flatnonzero(full)
+        row_best[rows] = rounded[rows].min(axis=1)
+        row_arg[rows] = rounded[rows].argmin(axis=1)
+    return tour,tour_cost
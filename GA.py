@@ -1,3 +1,5 @@
+import os
+import hashlib
 import random
 import numpy as np
 import time as tm
@@ -5,8 +7,18 @@ import matplotlib.pyplot as plt
 import constheur as const
 import math
 import bisect
+import heapq
 opt2 = __import__('2opt')
 opt3 = __import__('3opt')
+import oropt
+import lk
+import candidates as cand
+import costs
+import population as popl
+import poparray
+import fingerprint as fp
+import memo
+import fixedpoint as fxp
 
 
 
@@ -17,6 +29,7 @@ def FirstTourCreation(cost_matrix):
     DESCRIPTION:  This function creates initial solutions for the TSP. Random solutions are created.
     
     Random Solutions: Solutions selected randomly are formed by a permutation of the client's nodes appending the depot (0) at first and last positions.
+    InitialPopulation does not call it: its random tours are drawn in batches by costs.RandomTours.
    
     INPUT: (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j. 
   
@@ -44,12 +57,21 @@ def CostCalculation(tour,cost_matrix):
     
     OUTPUT: (tour_cost)      - Total cost of the input tour.
     """    
-    tour_cost = 0
-    for i in range(len(tour)-1):
-        node_i = tour[i]
-        node_j = tour[i+1]          
-        tour_cost = tour_cost + cost_matrix[node_i][node_j]  
-    return round(tour_cost,2)
+    return round(costs.CostCalculation(tour,cost_matrix),2)
+
+
+def PopulationCosts(tours,cost_array):
+    """
+    FUNCTION: PopulationCosts
+     
+    DESCRIPTION:  This function calculates the costs of many tours with one call of the batched kernel costs.TourCosts, rounded as CostCalculation.
+    
+    INPUT: (tours)      - 2-D array (or list of lists) with one tour per row
+           (cost_array) - Cost matrix (full) as a np.array
+    
+    OUTPUT: (tour_costs) - List with the total cost of each tour.
+    """    
+    return [round(cost,2) for cost in costs.TourCosts(tours,cost_array).tolist()]
 
 
 def Fitness(cost,scale = 1.0e4):
@@ -76,7 +98,7 @@ def GetFittest(population):
            
     OUTPUT: First postion in the population
     """   
-    return population[0]
+    return popl.Best(population)
 
 
     
@@ -112,7 +134,7 @@ def BiContains(pop, item):
  
  
  
-def InitialPopulation(n,cost_matrix):
+def InitialPopulation(n,cost_matrix,cost_array = None,asymmetric = False,nn_starts = None):
     """
     FUNCTION: InitialPopulation    
     
@@ -120,58 +142,41 @@ def InitialPopulation(n,cost_matrix):
     
     INPUT: (n)           - Number of individuals required in the initial population
            (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (cost_array)  - The cost matrix as a np.array, used by the batched cost kernel (default = None, converted here)
+           (asymmetric)  - Boolean to keep a tour and its reversal as different members (default = False)
+           (nn_starts)   - Number of random start nodes of the multi-start NN tours (constheur.NNBatch) (default = None, the population size; 0 for none)
         
            
     OUTPUT: (sorted(pop)) - Sorted population by Fitness value
     """ 
+    if cost_array is None:
+        cost_array = np.asarray(cost_matrix,dtype='float64')
     pop = list()
-    #Clarke and Wright 
-    tour_cw = const.ClarkeWright(cost_matrix)
-#    print len(tour_cw)
-    cost_cw = CostCalculation(tour_cw,cost_matrix)
-    fitness_cw = Fitness(cost_cw)
-    pop.append((fitness_cw,tour_cw,cost_cw))
-    
-    #Nearest Neighbour
-    tour_nn = const.NN(cost_matrix)
-#    print len(tour_nn)
-    cost_nn = CostCalculation(tour_nn,cost_matrix)
-    fitness_nn = Fitness(cost_nn)
-    if fitness_nn != fitness_cw:      
-        pop.append((fitness_nn,tour_nn,cost_nn))
-    
-    #Random Insertion
-    tour_ri = const.RandomInsertion(cost_matrix)
-#    print len(tour_ri)
-    cost_ri = CostCalculation(tour_ri,cost_matrix)
-    fitness_ri =  Fitness(cost_ri)
-    if fitness_ri != fitness_cw and fitness_ri != fitness_nn: 
-        pop.append((fitness_ri,tour_ri,cost_ri))
-    
-    pop = sorted(pop)
-    
-    i = 3
+    index = popl.PopulationIndex(pop,not asymmetric)
+    #Clarke and Wright, Nearest Neighbour, MST preorder and the Random, Nearest, Farthest and Cheapest Insertion
+    tours = [const.ClarkeWright(cost_matrix),const.NN(cost_matrix),const.MSTPreOrder(cost_array)] + [const.Insertion(cost_matrix,rule) for rule in const.INSERTION_RULES]
+    
+    #Nearest Neighbour from random start nodes, built in one batch
+    if nn_starts is None:
+        nn_starts = n
+    nn_starts = min(nn_starts,len(cost_matrix))
+    if nn_starts > 0:
+        tours = tours + const.NNBatch(cost_array,random.sample(range(0,len(cost_matrix)),nn_starts)).tolist()
+    
+    #Random tours, created and evaluated in batches
     count = 0
-  
-    while (i < n):
-        tour = FirstTourCreation(cost_matrix)
-        cost = CostCalculation(tour,cost_matrix)
-        fitness = Fitness(cost)
-        
-        insert = 1
-        if len(pop) != 0:
-            if (BiContains(pop,cost)):
-                insert = 0
-                
-        if insert == 1:
-            pop.append((fitness,tour,cost))
-            i = i+1
-        
-        count = count + 1
-        if count >= 4*n:
+    while (len(pop) < n):
+        tour_costs = PopulationCosts(tours,cost_array)
+        fingerprints = fp.TourFingerprints(tours,not asymmetric)
+        for tour,cost,fingerprint in zip(tours,tour_costs,fingerprints):
+            if not popl.Contains(index,fingerprint) and len(pop) < n:
+                popl.Insert(pop,index,(Fitness(cost),tour,cost),fingerprint)
+            count = count + 1
+        tours = costs.RandomTours(n-len(pop),len(cost_matrix)).tolist()
+            
+        if len(pop) < n and count >= 4*n:
             raise ValueError("Could not form the entire population!")
     
-    pop = sorted(pop)      
     return pop 
 
 
@@ -197,7 +202,7 @@ def OXCrossover(parent_1,parent_2):
     First, a random slice is swapped between the two tours, as in a two-point crossover. Second, repeated cities
     not in the swapped area are removed, and the remaining integers are added
     from the other tour, in the order that they appear starting from the end
-    index of the swapped section.
+    index of the swapped section. Each child is built in O(n) by OXChild.
     
     INPUT: (parent_1)  - List containing a TSP tour
            (parent_2)  - List containing a TSP tour 
@@ -205,43 +210,77 @@ def OXCrossover(parent_1,parent_2):
            
     OUTPUT: (child_1,child_2) - Two offsprings generated by the input parents
     """ 
-     
-    parent_1 = list(parent_1[1:-1])
-    parent_2 = list(parent_2[1:-1])
-       
-    n =  len(parent_1)
- 
-
+    n = len(parent_1)-2
     start = random.randint(0,n-1)
     end   = random.randint(start+1,n)
+    return OXChild(parent_1,parent_2,start,end),OXChild(parent_2,parent_1,start,end)
+
+
+def OXChild(parent_1,parent_2,start,end):
+    """
+    FUNCTION: OXChild   
     
-    child_1 = list()
-    child_2 = list()
-    
-    
-    child_1[start:end] =  parent_1[start:end]
-    child_2[start:end] =  parent_2[start:end]
+    DESCRIPTION:  This function builds in O(n) the child of the ordered crossover that keeps the clients start..end-1 (0-based, depot excluded) of parent_1.
+    A marker array flags the nodes of the slice, so the other nodes are taken from parent_2, starting after the slice, with one O(1) test each.
     
-     
-     
+    INPUT: (parent_1)  - List containing a TSP tour, giving the slice
+           (parent_2)  - List containing a TSP tour, giving the order of the other nodes
+           (start)     - First client of the slice
+           (end)       - Client after the slice
+           
+    OUTPUT: (child) - Offspring, starting and ending at the depot (0).
+    """ 
+    n = len(parent_1)-2
+    child = [0]*(n+2)
+    marker = [False]*(n+1)
+    for p in range(start+1,end+1):
+        child[p] = parent_1[p]
+        marker[parent_1[p]] = True
+    position = end
     for i in range(0,n):
-        current_index = (end + i) % n
-
-        current_node_parent_1 = parent_1[current_index]
-        current_node_parent_2 = parent_2[current_index]
-      
-        if current_node_parent_2 not in child_1:
-            child_1.append(current_node_parent_2)
-      
-        if current_node_parent_1 not in child_2:
-            child_2.append(current_node_parent_1)
-            
-    child_1 = Rotate(child_1,start)
-    child_2 = Rotate(child_2,start)
+        node = parent_2[(end+i) % n + 1]
+        if not marker[node]:
+            child[position % n + 1] = node
+            position += 1
+    return child
+
+
+def OXCrossoverBatch(parents_1,parents_2,starts,ends):
+    """
+    FUNCTION: OXCrossoverBatch   
+    
+    DESCRIPTION:  This function performs the ordered crossover of many pairs of parents at once with NumPy, giving the same children as OXChild.
+    For each pair, parent_2 is rolled to start after the slice, its nodes in the slice of parent_1 are moved to the end by a stable argsort,
+    the slice of parent_1 takes their place and the result is scattered back, rolled to the positions after the slice.
     
-    child_1 = [0]+child_1+[0]
-    child_2 = [0]+child_2+[0]
-    return child_1,child_2        
+    INPUT: (parents_1) - 2-D array (or list of lists) with one tour per row, giving the slices
+           (parents_2) - 2-D array (or list of lists) with one tour per row, giving the order of the other nodes
+           (starts)    - First client of the slice of each pair (0-based, depot excluded)
+           (ends)      - Client after the slice of each pair
+           
+    OUTPUT: (children) - np.array with one offspring per row, starting and ending at the depot (0).
+    """ 
+    parents_1 = np.asarray(parents_1)[:,1:-1]
+    parents_2 = np.asarray(parents_2)[:,1:-1]
+    m,n = parents_1.shape
+    starts = np.asarray(starts)[:,None]
+    ends = np.asarray(ends)[:,None]
+    rows = np.arange(m)[:,None]
+    steps = np.arange(n)[None,:]
+    
+    # position of every node in parent_1, to find the nodes of the slice
+    position = np.empty((m,n+1),dtype='int64')
+    position[rows,parents_1] = steps
+    
+    rolled = (ends + steps) % n
+    order_2 = parents_2[rows,rolled]
+    in_slice = position[rows,order_2]
+    in_slice = (in_slice >= starts) & (in_slice < ends)
+    order_2 = order_2[rows,np.argsort(in_slice,axis=1,kind='mergesort')]
+    
+    children = np.zeros((m,n+2),dtype=parents_1.dtype)
+    children[rows,rolled+1] = np.where(steps < n-(ends-starts),order_2,parents_1[rows,rolled])
+    return children        
     
 def SelectParent(pop):
     """
@@ -254,37 +293,87 @@ def SelectParent(pop):
            
     OUTPUT: ([fit,tour,cost]) - An entry o the GA population containing the fitness, tour and cost
     """ 
-    index = random.choice(range(0,len(pop)))       
-    return pop[index]
+    return pop[popl.RandomRank(pop)]
     
 
             
  
-def Mutation(child,child_cost,cost_matrix):
+# LS of the mutation that reverse paths with undirected costs, and do not stop on asymmetric cost matrices
+SYMMETRIC_LS = ('2opt-first','LK')
+
+def CheckLS(ls,asymmetric):
+    """
+    FUNCTION: CheckLS   
+    
+    DESCRIPTION:  This function checks that the LS of the mutation can work on the cost matrix: the LS of SYMMETRIC_LS are rejected on asymmetric matrices.
+    
+    INPUT: (ls) - LS used in the mutation
+           (asymmetric) - Boolean for asymmetric cost matrices
+           
+    OUTPUT: None. Raises a ValueError if the LS assumes a symmetric matrix.
+    """ 
+    if asymmetric and ls in SYMMETRIC_LS:
+        raise ValueError("The LS "+str(ls)+" assumes a symmetric cost matrix, use '2opt' or 'LS' on asymmetric matrices!")
+
+def Mutation(child,child_cost,cost_matrix,candidates = None,ls = 'LS',stats = None,asymmetric = False,window = None,or_opt = None,cache = None):
     """
     FUNCTION: Mutation   
     
     DESCRIPTION:  This function performs the mutation in the GA. Mutation is performed by firt attempting a LS move. 
+    If or_opt is given, the Or-opt (segments of up to or_opt nodes moved to their best insertion point) is applied after the LS.
     a 3-opt move is attempted with probability (p).
+    The LS can be LSFast ('LS'), LSFastVectorized ('LSVectorized'), LSFastIncremental ('LSIncremental'), the best improvement 2-opt TwoOptFast ('2opt')
+    or the first improvement 2-opt with don't-look bits TwoOptFirst ('2opt-first') or the LK-style variable-depth search LinKernighan ('LK').
+    With a memo cache, the result of the mutation is stored for the fingerprint of the child (and the cost matrix), and a child already mutated returns it at once.
     
     INPUT: (child)  - TSP tour
            (child_cost) - cost of the TSP tour
            (cost_matrix)  - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (candidates) - Candidate lists restricting the LS moves to candidate edges, ignored by 'LSIncremental' (default = None, full LS)
+           (ls) - LS used in the mutation: 'LS', 'LSVectorized', 'LSIncremental', '2opt', '2opt-first' or 'LK' (default = 'LS')
+           (stats) - Dictionary where the 2-opt searches accumulate the number of moves evaluated and applied and the Or-opt its calls, time and gain (default = None)
+           (asymmetric) - Boolean to compute exact LS changes on asymmetric cost matrices (the LS of SYMMETRIC_LS are rejected, see CheckLS) (default = False)
+           (window) - Maximum length of the segments moved by the 3-opt (Or-3opt) (default = None, full 3-opt unless candidate lists are given)
+           (or_opt) - Maximum length of the segments moved by the Or-opt (default = None, no Or-opt)
+           (cache) - Memo cache given by memo.MemoCache (default = None, no cache)
            
     OUTPUT: (mutation) - An entry o the GA population containing the  tour
             (mutation_cost) - An entry o the GA population containing the cost
     """ 
-
+    CheckLS(ls,asymmetric)
+    if cache is not None:
+        key = (id(cost_matrix),fp.TourFingerprint(child,not asymmetric))
+        result = memo.Lookup(cache,key)
+        if result is not None:
+            return list(result[0]),result[1]
         
-    mutation,mutation_cost = opt2.LSFast(child,child_cost,cost_matrix)   
+    if ls == 'LS':
+        mutation,mutation_cost = opt2.LSFast(child,child_cost,cost_matrix,candidates,asymmetric)   
+    elif ls == 'LSVectorized':
+        mutation,mutation_cost = opt2.LSFastVectorized(child,child_cost,cost_matrix,candidates,asymmetric)
+    elif ls == 'LSIncremental':
+        mutation,mutation_cost = opt2.LSFastIncremental(child,child_cost,cost_matrix,asymmetric)
+    elif ls == '2opt':
+        mutation,mutation_cost = opt2.TwoOptFast(child,cost_matrix,candidates,stats,asymmetric)
+    elif ls == '2opt-first':
+        mutation,mutation_cost = opt2.TwoOptFirst(child,cost_matrix,candidates,stats)
+    elif ls == 'LK':
+        mutation,mutation_cost = lk.LinKernighan(child,cost_matrix,candidates,10,stats)
+    else:
+        raise ValueError("Unknown LS: "+str(ls))
+
+    if or_opt is not None:
+        mutation,mutation_cost = oropt.OrOpt(mutation,mutation_cost,cost_matrix,or_opt,stats)
 
     r = random.uniform(0,1)
     if r < 0.5:
-        mutation,mutation_cost = opt3.ThreeOptFast(mutation,cost_matrix)
+        mutation,mutation_cost = opt3.ThreeOptFast(mutation,cost_matrix,asymmetric,candidates,window)
         
+    if cache is not None:
+        memo.Store(cache,key,(list(mutation),mutation_cost))
     return mutation,mutation_cost 
 
-def GA(cost_matrix,population_size, population, mutation_rate, number_success, number_unsuccess ):
+def GA(cost_matrix,population_size, population, mutation_rate, number_success, number_unsuccess, candidates = None, ls = 'LS', asymmetric = False, window = None, or_opt = None, stats = None, cost_array = None, cache = None ):
     """
     FUNCTION: GA   
     
@@ -300,15 +389,26 @@ def GA(cost_matrix,population_size, population, mutation_rate, number_success, n
            (mutation_rate) - Probability of having a mutation in the best offspring
            (number_success)  - max number of sucessful offspring
            (number_unsuccess)  - max number of unsucessful offspring
+           (candidates)  - Candidate lists used by the mutation (default = None)
+           (ls)  - LS used by the mutation (default = 'LS')
+           (asymmetric)  - Boolean to compute exact LS changes on asymmetric cost matrices (default = False)
+           (window)  - Maximum length of the segments moved by the 3-opt of the mutation (default = None)
+           (or_opt)  - Maximum length of the segments moved by the Or-opt of the mutation (default = None)
+           (stats)  - Dictionary where the mutation accumulates its statistics (default = None)
+           (cost_array)  - The cost matrix as a np.array, used by the batched cost kernel (default = None, converted here)
+           (cache)  - Memo cache of the mutation given by memo.MemoCache (default = None)
            
            
     OUTPUT: (population) - A GA population containing fitness, tour and cost for al ts members.
     """   
     
+    if cost_array is None:
+        cost_array = np.asarray(cost_matrix,dtype='float64')
+    index = popl.PopulationIndex(population,not asymmetric)
     success = 0
     no_improve = 0
     while (success < number_success and no_improve < number_unsuccess):
-        current_best = population[0]
+        current_best = popl.Best(population)
         parent_1_candidate_1 = SelectParent(population)
         parent_1_candidate_2 = SelectParent(population)
         
@@ -341,24 +441,24 @@ def GA(cost_matrix,population_size, population, mutation_rate, number_success, n
 
         rand = random.uniform(0, 1) 
         
-        child_cost = CostCalculation(child,cost_matrix)
+        child_cost = PopulationCosts([child],cost_array)[0]
         if  rand < mutation_rate:
-            child,child_cost = Mutation(child,child_cost,cost_matrix)
+            child,child_cost = Mutation(child,child_cost,cost_matrix,candidates,ls,stats,asymmetric,window,or_opt,cache)
         
         child_fitness = Fitness(child_cost)            
 
-        k = random.randint(math.floor(population_size/2.0),population_size-1)
+        k = popl.RandomRank(population,int(math.floor(population_size/2.0)),population_size-1)
 
         add = 1
-        if BiContains(population,child_cost):
+        fingerprint = popl.Fingerprint(index,child)
+        if popl.Contains(index,fingerprint):
             add = 0
 
         if add == 1 and child_cost < population[k][2] :
-            population[k] =  (child_fitness,child,child_cost)
+            popl.Replace(population,index,k,(child_fitness,child,child_cost),fingerprint)
             success = success + 1
 
-        population = sorted(population)
-        if population[0] == current_best:
+        if popl.Best(population) == current_best:
             no_improve += 1
 #            print no_improve
 
@@ -368,6 +468,147 @@ def GA(cost_matrix,population_size, population, mutation_rate, number_success, n
     return population    
 
 
+def GACompact(cost_matrix,population_size, population, mutation_rate, number_success, number_unsuccess, candidates = None, ls = 'LS', asymmetric = False, window = None, or_opt = None, stats = None, cost_array = None, cache = None ):
+    """
+    FUNCTION: GACompact   
+    
+    DESCRIPTION:  This function performs the Genetic Algorithm as GA (same operators, random draws and stopping criteria) on an array-backed population (poparray).
+    The parents are read from the rows of the population and a successful child overwrites the row of the member it replaces, 
+    so no tuple or list is kept per member, for large populations and island runs.
+    
+    INPUT: (cost_matrix)  - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (population_size)  - Size of the desired population
+           (population) - current population, given by poparray.FromEntries
+           (mutation_rate),(number_success),(number_unsuccess),(candidates),(ls),(asymmetric),(window),(or_opt),(stats),(cost_array),(cache) - As in GA
+           
+    OUTPUT: (population) - The input population, modified in place.
+    """   
+    
+    if cost_array is None:
+        cost_array = np.asarray(cost_matrix,dtype='float64')
+    success = 0
+    no_improve = 0
+    while (success < number_success and no_improve < number_unsuccess):
+        current_best = poparray.Cost(population,0)
+        size = population['size']
+        parents = []
+        for parent in range(0,2):
+            candidate_1 = random.randint(0,size-1)
+            candidate_2 = random.randint(0,size-1)
+            if poparray.Cost(population,candidate_1) < poparray.Cost(population,candidate_2):
+                parents.append(poparray.Tour(population,candidate_1).tolist())
+            else:
+                parents.append(poparray.Tour(population,candidate_2).tolist())
+    
+        child_1,child_2 = OXCrossover(parents[0],parents[1])
+        
+        which_child = random.choice([1,2])
+        
+        if which_child == 1 :
+            child = child_1
+        else:
+            child = child_2
+
+        rand = random.uniform(0, 1) 
+        
+        child_cost = PopulationCosts([child],cost_array)[0]
+        if  rand < mutation_rate:
+            child,child_cost = Mutation(child,child_cost,cost_matrix,candidates,ls,stats,asymmetric,window,or_opt,cache)
+
+        k = random.randint(int(math.floor(population_size/2.0)),population_size-1)
+
+        fingerprint = poparray.Fingerprint(population,child)
+        if not poparray.Contains(population,fingerprint) and child_cost < poparray.Cost(population,k):
+            poparray.Replace(population,k,child,child_cost,fingerprint)
+            success = success + 1
+
+        if poparray.Cost(population,0) == current_best:
+            no_improve += 1
+
+    print "number of success....", success
+    print "no improvement....", no_improve
+
+    return population    
+
+
+def GAGenerational(cost_matrix,population_size, population, mutation_rate, number_success, number_unsuccess, batch_size = None, candidates = None, ls = 'LS', asymmetric = False, window = None, or_opt = None, stats = None, cost_array = None, cache = None ):
+    """
+    FUNCTION: GAGenerational   
+    
+    DESCRIPTION:  This function performs the Genetic Algorithm in batches (generational mode), with the same operators and stopping criteria as GA.
+    Each batch selects batch_size pairs of parents at once by binary tournaments (the population is sorted, so the lower rank wins),
+    creates one child per pair with OXCrossoverBatch and evaluates all their costs in one call. The mutation is applied to the best children only,
+    as many as expected with the mutation rate. The children that are not duplicates compete with the worse half of the population
+    and the new population is merged in a single pass, so the Python overhead is paid once per batch instead of once per child.
+    The success counts the children accepted in the population and the no improvement counts the children of the batches where the best solution did not change.
+    
+    INPUT: (cost_matrix)  - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (population_size)  - Size of the desired population
+           (population) - current population
+           (mutation_rate) - Probability of having a mutation in the best offspring
+           (number_success)  - max number of sucessful offspring
+           (number_unsuccess)  - max number of unsucessful offspring
+           (batch_size)  - Number of children of each batch (default = None, the population size)
+           (candidates)  - Candidate lists used by the mutation (default = None)
+           (ls)  - LS used by the mutation (default = 'LS')
+           (asymmetric)  - Boolean to compute exact LS changes on asymmetric cost matrices (default = False)
+           (window)  - Maximum length of the segments moved by the 3-opt of the mutation (default = None)
+           (or_opt)  - Maximum length of the segments moved by the Or-opt of the mutation (default = None)
+           (stats)  - Dictionary where the mutation accumulates its statistics (default = None)
+           (cost_array)  - The cost matrix as a np.array, used by the batched cost kernel (default = None, converted here)
+           (cache)  - Memo cache of the mutation given by memo.MemoCache (default = None)
+           
+    OUTPUT: (population) - A GA population containing fitness, tour and cost for al ts members.
+    """   
+    if cost_array is None:
+        cost_array = np.asarray(cost_matrix,dtype='float64')
+    if batch_size is None:
+        batch_size = population_size
+    rng = np.random.RandomState(random.getrandbits(32))
+    half = int(math.floor(population_size/2.0))
+    index = popl.PopulationIndex(population,not asymmetric)
+    success = 0
+    no_improve = 0
+    while (success < number_success and no_improve < number_unsuccess):
+        current_best = popl.Best(population)
+        tours = np.array([tour for fit,tour,cost in population])
+        n = tours.shape[1]-2
+        
+        ranks = rng.randint(0,len(population),(2,batch_size,2)).min(axis=2)
+        swap = rng.randint(0,2,batch_size)[:,None] == 1
+        parents_1 = np.where(swap,tours[ranks[1]],tours[ranks[0]])
+        parents_2 = np.where(swap,tours[ranks[0]],tours[ranks[1]])
+        starts = rng.randint(0,n,batch_size)
+        ends = starts + 1 + (rng.random_sample(batch_size)*(n-starts)).astype('int64')
+        children = OXCrossoverBatch(parents_1,parents_2,starts,ends).tolist()
+        children_costs = PopulationCosts(children,cost_array)
+        
+        mutations = rng.binomial(batch_size,mutation_rate)
+        for i in np.argsort(children_costs,kind='mergesort')[:mutations]:
+            children[i],children_costs[i] = Mutation(children[i],children_costs[i],cost_matrix,candidates,ls,stats,asymmetric,window,or_opt,cache)
+        
+        new_entries = []
+        seen = set()
+        for child,child_cost,fingerprint in zip(children,children_costs,fp.TourFingerprints(children,not asymmetric)):
+            if not popl.Contains(index,fingerprint) and fingerprint not in seen:
+                seen.add(fingerprint)
+                new_entries.append((Fitness(child_cost),child,child_cost))
+        
+        worse = sorted(population[half:] + new_entries)[:population_size-half]
+        accepted = set(id(entry) for entry in new_entries)
+        success = success + sum(1 for entry in worse if id(entry) in accepted)
+        population = list(heapq.merge(population[:half],worse))
+        index = popl.PopulationIndex(population,not asymmetric)
+        
+        if popl.Best(population) == current_best:
+            no_improve += batch_size
+
+    print "number of success....", success
+    print "no improvement....", no_improve
+
+    return population    
+
+
 def PrintResults(matrix,fittest,solutions,time,plot = True):
     """
     FUNCTION: PrintResults   
@@ -399,7 +640,7 @@ def PrintResults(matrix,fittest,solutions,time,plot = True):
 
 
 
-def ImproveGA(pop,cost_matrix):
+def ImproveGA(pop,cost_matrix,cost_array = None,asymmetric = False):
     """
     FUNCTION: ImproveGA   
     Every time the GA is restarted this function is called to improve some of its solutions. 
@@ -410,35 +651,44 @@ def ImproveGA(pop,cost_matrix):
     INPUT: (cost_matrix)  - Cost matrix (full) with the associated cost of moving from node i to node j.
            
            (pop) - current population
+           (cost_array)  - The cost matrix as a np.array, used by the batched cost kernel (default = None, converted here)
+           (asymmetric)  - Boolean to keep a tour and its reversal as different members (default = False)
 
            
            
     OUTPUT: (new_pop) - A GA population containing fitness, tour and cost for al ts members.
     """   
 
+    if cost_array is None:
+        cost_array = np.asarray(cost_matrix,dtype='float64')
+    tours = costs.RandomTours(8,len(cost_matrix))
     new_tours = [] 
-    for i in range(0,8):
-        tour = FirstTourCreation(cost_matrix)
-        cost = CostCalculation(tour,cost_matrix)
+    for tour,cost in zip(tours.tolist(),PopulationCosts(tours,cost_array)):
         fitness = Fitness(cost)
         new_tours.append((fitness,tour,cost))
     new_tours = sorted(new_tours)
 
     new_pop = list(pop)
+    index = popl.PopulationIndex(new_pop,not asymmetric)
     
     for fit,tour,cost in new_tours:
-        worst = new_pop[-1]
-        if cost <  worst[2] and BiContains(new_pop,cost) == False:
-            new_pop[-1] = (fit,tour,cost)
-            
-            new_pop = sorted(new_pop)
+        worst = popl.Worst(new_pop)
+        fingerprint = popl.Fingerprint(index,tour)
+        if cost <  worst[2] and popl.Contains(index,fingerprint) == False:
+            popl.Replace(new_pop,index,len(new_pop)-1,(fit,tour,cost),fingerprint)
             
         else:
-            for pop_fit,pop_tour,pop_cost in new_pop:
+            # crossover with the entire population in one batch
+            pop_tours = [pop_tour for pop_fit,pop_tour,pop_cost in new_pop]
+            starts = [random.randint(0,len(tour)-3) for pop_tour in pop_tours]
+            ends = [random.randint(start+1,len(tour)-2) for start in starts]
+            children_1 = OXCrossoverBatch([tour]*len(pop_tours),pop_tours,starts,ends)
+            children_2 = OXCrossoverBatch(pop_tours,[tour]*len(pop_tours),starts,ends)
+            children_costs = PopulationCosts(np.concatenate((children_1,children_2)),cost_array)
+            for i in range(0,len(pop_tours)):
                 
-                child_1,child_2 = OXCrossover(tour,pop_tour)
-                child_1_cost = CostCalculation(child_1,cost_matrix)
-                child_2_cost = CostCalculation(child_2,cost_matrix)
+                child_1,child_2 = children_1[i].tolist(),children_2[i].tolist()
+                child_1_cost,child_2_cost = children_costs[i],children_costs[len(pop_tours)+i]
                 if  child_1_cost < child_2_cost:
                     
                     child = child_1
@@ -446,10 +696,11 @@ def ImproveGA(pop,cost_matrix):
                 else:
                     child = child_2
                     child_cost = child_2_cost
-                if (child_cost < worst[2] and BiContains(new_pop,child_cost) == False):
-                    new_pop[-1] = (Fitness(child_cost),child,child_cost)
-                    new_pop = sorted(new_pop)
-                    break
+                if child_cost < worst[2]:
+                    fingerprint = popl.Fingerprint(index,child)
+                    if popl.Contains(index,fingerprint) == False:
+                        popl.Replace(new_pop,index,len(new_pop)-1,(Fitness(child_cost),child,child_cost),fingerprint)
+                        break
                     
     return new_pop        
                 
@@ -458,7 +709,7 @@ def ImproveGA(pop,cost_matrix):
         
     
         
-def main(matrix,pop_size,num_of_restarts = 5, max_restart_no_improvement = 5,mutation_rate = 0.005, num_of_success = 500,number_of_unsuccess = 250,show= True ):
+def main(matrix,pop_size,num_of_restarts = 5, max_restart_no_improvement = 5,mutation_rate = 0.005, num_of_success = 500,number_of_unsuccess = 250,show= True, candidates = None, ls = 'LS', asymmetric = None, window = None, or_opt = None, cache_size = None, batch_size = None, fixed_point = False, compact = False ):
     """
     FUNCTION: main   
     
@@ -477,15 +728,39 @@ def main(matrix,pop_size,num_of_restarts = 5, max_restart_no_improvement = 5,mut
           
 
            (show)  - Boolean that prints the results on the screen
+           (candidates)  - Candidate lists (candidates.CandidateLists) restricting the mutation LS to candidate edges, for large instances (default = None)
+           (ls)  - LS used by the mutation: 'LS', 'LSVectorized', 'LSIncremental', '2opt', '2opt-first' or 'LK' (default = 'LS', 'LK' builds the candidate lists if none are given)
+           (asymmetric)  - Boolean to compute exact LS changes on asymmetric cost matrices (default = None, checked once with IsSymmetric)
+           (window)  - Maximum length of the segments moved by the 3-opt of the mutation (Or-3opt) (default = None)
+           (or_opt)  - Maximum length of the segments moved by the Or-opt of the mutation (default = None, no Or-opt)
+           (cache_size)  - Capacity of the memo cache of the mutation (default = None, no cache)
+           (batch_size)  - Number of children of each batch of the generational GA (GAGenerational) (default = None, steady-state GA)
+           (fixed_point)  - Boolean to run the GA on the fixed-point (int32 hundredths) matrix of fixedpoint.FixedPointMatrix, with exact costs (default = False)
+           (compact)  - Boolean to run the steady-state GA on an array-backed population (GACompact), not valid with a batch_size (default = False)
     OUTPUT: None.
     """  
     time_start = tm.time()
     
-
+    if asymmetric is None:
+        asymmetric = not IsSymmetric(matrix)
+    CheckLS(ls,asymmetric)
+    if compact and batch_size is not None:
+        raise ValueError("The compact population only runs the steady-state GA, without a batch_size!")
+    if ls == 'LK' and candidates is None:
+        candidates = cand.CandidateLists(matrix)
             
     best_solution = []
+    stats = {}
+    if fixed_point:
+        cost_array = fxp.FixedPointMatrix(matrix)
+        matrix = cost_array.tolist()
+    else:
+        cost_array = np.asarray(matrix,dtype='float64')
+    cache = None
+    if cache_size is not None:
+        cache = memo.MemoCache(cache_size)
     
-    pop = InitialPopulation(pop_size,matrix)
+    pop = InitialPopulation(pop_size,matrix,cost_array,asymmetric)
     best_solution.append(GetFittest(pop)[2])
     print "Population: 0 created" 
 
@@ -494,8 +769,14 @@ def main(matrix,pop_size,num_of_restarts = 5, max_restart_no_improvement = 5,mut
     for i in range(1,num_of_restarts+1):
         print "GA run: ",i, "created"
         if i > 1:
-            pop = ImproveGA(pop,matrix)
-        pop = GA(matrix,pop_size,pop,mutation_rate,num_of_success,number_of_unsuccess)
+            pop = ImproveGA(pop,matrix,cost_array,asymmetric)
+        if compact:
+            cost_dtype = 'int64' if fixed_point else 'float64'
+            pop = poparray.Entries(GACompact(matrix,pop_size,poparray.FromEntries(pop,not asymmetric,pop_size,cost_dtype),mutation_rate,num_of_success,number_of_unsuccess,candidates,ls,asymmetric,window,or_opt,stats,cost_array,cache))
+        elif batch_size is None:
+            pop = GA(matrix,pop_size,pop,mutation_rate,num_of_success,number_of_unsuccess,candidates,ls,asymmetric,window,or_opt,stats,cost_array,cache)
+        else:
+            pop = GAGenerational(matrix,pop_size,pop,mutation_rate,num_of_success,number_of_unsuccess,batch_size,candidates,ls,asymmetric,window,or_opt,stats,cost_array,cache)
 
         best_solution.append(GetFittest(pop)[2])
         
@@ -509,44 +790,99 @@ def main(matrix,pop_size,num_of_restarts = 5, max_restart_no_improvement = 5,mut
         
     time_finish = tm.time()
     total_time  =  time_finish - time_start
+    fittest = GetFittest(pop)
+    if fixed_point:
+        fittest = (fxp.ToCost(fittest[0]),fittest[1],fxp.ToCost(fittest[2]))
+        best_solution = [fxp.ToCost(cost) for cost in best_solution]
     if show:
-        PrintResults(matrix,GetFittest(pop),best_solution,total_time)
+        PrintResults(matrix,fittest,best_solution,total_time)
+        if stats.get('oropt_calls',0) > 0:
+            print "The Or-opt was called", stats['oropt_calls'], "times, taking", round(stats['oropt_time']/stats['oropt_calls'],4), "(s) and gaining", round(stats['oropt_gain']/stats['oropt_calls'],2), "per call."
+        if cache is not None:
+            print "The mutation cache had", cache['hits'], "hits,", cache['misses'], "misses and", cache['evictions'], "evictions."
         
-    return GetFittest(pop),total_time
+    return fittest,total_time
 
 
+
+def IsSymmetric(cost_matrix):
+    """
+    FUNCTION: IsSymmetric   
+    
+    DESCRIPTION:  This function checks if a cost matrix is symmetric. The speed and load gradient matrices are asymmetric, and the LS needs exact changes on them.
+    
+    INPUT: (cost_matrix)  - Cost matrix (full) with the associated cost of moving from node i to node j.
+    
+    OUTPUT: True - If cost_matrix[i][j] == cost_matrix[j][i] for all i,j. False - Otherwise
+    """  
+    matrix = np.asarray(cost_matrix)
+    return bool(np.array_equal(matrix,matrix.T))
+
         
-def GenerateMatrix(a_text_file = False, a_matrix = False):
+def GenerateMatrix(a_text_file = False, a_matrix = False, cache = False):
     """
     FUNCTION: GenerateMatrix   
     
     DESCRIPTION:  This function transforms a np.array matrix in a list. 
+    The missing costs (NaN) are replaced by the mean cost and the costs are rounded to 2 decimals, both vectorized (see CleanMatrix).
     
     INPUT: (a_text_file)  - Text file cost matrix (full) with the associated cost of moving from node i to node j.
            (a_matrix)     - Python cost matrix (full) with the associated cost of moving from node i to node j.
+           (cache)        - Boolean to read the text file through the binary cache of LoadMatrix (default = False)
     OUTPUT: None.
     """  
     
     if a_text_file:
+        if cache:
+            return LoadMatrix(a_text_file).tolist()
         matrix  = np.genfromtxt(a_text_file, dtype='float64')
-        mean = np.nanmean(matrix)
-        matrix[np.isnan(matrix)] = mean
-        matrix = matrix.tolist()
-        for i in range(0,len(matrix)):
-            for j in range(0,len(matrix)):
-                matrix[i][j] = round(matrix[i][j],2) 
-        return matrix
+        return CleanMatrix(matrix).tolist()
     
     else:
-        matrix  = a_matrix
-        mean = np.nanmean(matrix)
-        matrix[np.isnan(matrix)] = mean
-        matrix = matrix.tolist()
-        for i in range(0,len(matrix)):
-            for j in range(0,len(matrix)):
-                matrix[i][j] = round(matrix[i][j],2) 
+        return CleanMatrix(a_matrix).tolist()
+
 
+def CleanMatrix(matrix):
+    """
+    FUNCTION: CleanMatrix   
+    
+    DESCRIPTION:  This function replaces the missing costs (NaN) of a np.array matrix by the mean cost and rounds the costs to 2 decimals, vectorized.
     
-        return matrix
+    INPUT: (matrix)  - np.array cost matrix (full) with the associated cost of moving from node i to node j.
+    OUTPUT: (matrix) - New np.array cost matrix.
+    """  
+    matrix = np.array(matrix,dtype='float64')
+    matrix[np.isnan(matrix)] = np.nanmean(matrix)
+    # half away from zero on the exact value, as round(x,2): the product by 100 is exact in long double
+    hundredths = np.floor(np.abs(matrix).astype(np.longdouble)*100 + np.longdouble(0.5))
+    return np.sign(matrix)*(hundredths.astype('float64')/100)
+
 
-    
\ No newline at end of file
+def LoadMatrix(a_text_file, cache_dir = None):
+    """
+    FUNCTION: LoadMatrix   
+    
+    DESCRIPTION:  This function loads a text cost matrix as a read-only np.array, through a binary cache: the first load parses the text file,
+    cleans it (CleanMatrix) and saves it as a .npy file keyed by the path, modification time and size of the text file; later loads memory-map the .npy file,
+    so they take milliseconds and no nested-list copy of the matrix is created. A changed text file gets a new cache file.
+    
+    INPUT: (a_text_file)  - Text file cost matrix (full) with the associated cost of moving from node i to node j.
+           (cache_dir)    - Folder of the cache files (default = None, the folder '.matrix_cache' next to the text file)
+    OUTPUT: (matrix) - Memory-mapped np.array cost matrix.
+    """  
+    path = os.path.abspath(a_text_file)
+    status = os.stat(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path),'.matrix_cache')
+    key = hashlib.md5(repr((path,status.st_mtime,status.st_size))).hexdigest()[:16]
+    cache_file = os.path.join(cache_dir,os.path.basename(path)+'.'+key+'.npy')
+    
+    if not os.path.exists(cache_file):
+        matrix = CleanMatrix(np.genfromtxt(path, dtype='float64'))
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        temporary = cache_file+'.'+str(os.getpid())+'.tmp'
+        with open(temporary,'wb') as f:
+            np.save(f,matrix)
+        os.rename(temporary,cache_file)
+    return np.load(cache_file,mmap_mode='r')
@@ -0,0 +1,134 @@
+import random
+import itertools
+import multiprocessing
+import time as tm
+import GA
+import candidates
+import costs
+import islands
+
+# matrices of each driver: name and suffix of the file
+MATRIX_FILES = (('MR','_distance.txt'),('MS','_matrix_with_speed.txt'),('MG','_matrix_with_load_gradient.txt'),('ME','_EU_2020.txt'))
+# parameters of GA.main used by run_TSP, with the NumPy LS taking the candidate lists of the large instances
+BASE_PARAMS = {'pop_size': 30,'num_of_restarts': 3,'max_restart_no_improvement': 3,'mutation_rate': 0.1,'num_of_success': 1000,'number_of_unsuccess': 1000,'ls': 'LSVectorized'}
+
+SHARED_MATRICES = {}
+
+
+def Jobs(drivers,solved = ('MR','MS','MG'),grid = None,seed = 0):
+    """
+    FUNCTION: Jobs
+
+    DESCRIPTION:  This function expands the driver x matrix x parameter grid into a list of jobs, each with its own seed.
+
+    INPUT: (drivers) - List of drivers
+           (solved)  - Names of the matrices solved for each driver (default = ('MR','MS','MG'))
+           (grid)    - Dictionary with a list of values for some parameters of GA.main, e.g. {'mutation_rate': [0.05,0.1]} (default = None, BASE_PARAMS)
+           (seed)    - Seed of the first job, job i uses seed+i (default = 0)
+
+    OUTPUT: (jobs) - List of dictionaries with the 'driver', the 'matrix', the 'params' of GA.main and the 'seed' of each job.
+    """
+    if grid is None:
+        grid = {}
+    keys = sorted(grid)
+    jobs = []
+    for driver in drivers:
+        for name in solved:
+            for values in itertools.product(*[grid[key] for key in keys]):
+                params = dict(BASE_PARAMS)
+                params.update(zip(keys,values))
+                jobs.append({'driver': driver,'matrix': name,'params': params,'seed': seed+len(jobs)})
+    return jobs
+
+
+def LoadMatrices(drivers,path = ''):
+    """
+    FUNCTION: LoadMatrices
+
+    DESCRIPTION:  This function reads every matrix of the drivers once (GA.LoadMatrix, binary cache) and copies it into shared memory (islands.SharedMatrix).
+
+    INPUT: (drivers) - List of drivers
+           (path)    - Folder of the matrix files (default = '')
+
+    OUTPUT: (matrices) - Dictionary where matrices[(driver,name)] is the pair (shared matrix, number of nodes).
+    """
+    matrices = {}
+    for driver in drivers:
+        for name,suffix in MATRIX_FILES:
+            matrix = GA.LoadMatrix(path+str(driver)+suffix)
+            matrices[(driver,name)] = (islands.SharedMatrix(matrix),len(matrix))
+    return matrices
+
+
+def InitWorker(matrices):
+    """
+    FUNCTION: InitWorker
+
+    DESCRIPTION:  This function keeps the shared matrices in each worker process of the pool.
+
+    INPUT: (matrices) - Shared matrices given by LoadMatrices
+
+    OUTPUT: None.
+    """
+    SHARED_MATRICES.update(matrices)
+
+
+def RunJob(job):
+    """
+    FUNCTION: RunJob
+
+    DESCRIPTION:  This function runs GA.main headless (show = False) for one job, on an np.array view of its shared matrix,
+    and evaluates the best tour on the four matrices of the driver.
+
+    INPUT: (job) - Job given by Jobs
+
+    OUTPUT: (job)     - The input job
+            (fittest) - [fit,tour,cost] of the best solution found
+            (time)    - Running time of GA.main
+            (row)     - Costs of the best tour on the matrices MR, ME, MS and MG (the row of the run_TSP table)
+    """
+    random.seed(job['seed'])
+    params = dict(job['params'])
+    shared,n = SHARED_MATRICES[(job['driver'],job['matrix'])]
+    matrix = islands.MatrixView(shared,n)
+    fittest,time = GA.main(matrix,params.pop('pop_size'),show = False,candidates = candidates.LargeInstanceLists(matrix),**params)
+    stack = costs.MatrixStack([islands.MatrixView(*SHARED_MATRICES[(job['driver'],name)]) for name in ('MR','ME','MS','MG')])
+    row = tuple(round(cost,2) for cost in costs.ObjectiveCosts([fittest[1]],stack)[:,0].tolist())
+    return job,fittest,time,row
+
+
+def RunBatch(jobs,matrices,processes = None):
+    """
+    FUNCTION: RunBatch
+
+    DESCRIPTION:  This function runs the jobs on a pool of worker processes sharing the matrices, and yields the results as they complete (not in the order of the jobs).
+
+    INPUT: (jobs)      - List of jobs given by Jobs
+           (matrices)  - Shared matrices given by LoadMatrices
+           (processes) - Number of worker processes (default = None, the number of CPU cores)
+
+    OUTPUT: Generator of the results of RunJob.
+    """
+    pool = multiprocessing.Pool(processes,InitWorker,(matrices,))
+    try:
+        for result in pool.imap_unordered(RunJob,jobs):
+            yield result
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+if __name__ == '__main__':
+
+    drivers = ["H430","M200","M2631","M452356","K510","N232631","P2652","T520","W420"]
+
+    path = ''
+
+    time_start = tm.time()
+    matrices = LoadMatrices(drivers,path)
+    for job,fittest,time,row in RunBatch(Jobs(drivers),matrices):
+        print "driver", job['driver'], job['matrix'], "seed", job['seed'], "cost", fittest[2], "time", round(time,2), "(s) MR, ME, MS, MG:", row
+    print "The batch took ",round(tm.time()-time_start,2),"(s) to run."
@@ -0,0 +1,174 @@
+import random
+import numpy as np
+import time as tm
+import GA
+import candidates
+import lk
+import islands
+opt2 = __import__('2opt')
+opt3 = __import__('3opt')
+
+
+def RandomMatrix(n,seed = 0,asymmetric = False):
+    """
+    FUNCTION: RandomMatrix
+
+    DESCRIPTION:  This function creates a symmetric euclidean cost matrix for n random points in a 100 x 100 square,
+    rounded to 2 decimals as the matrices read by GenerateMatrix. The asymmetric matrix adds a random cost (0 to 30) to each directed edge.
+
+    INPUT: (n)          - Number of nodes, including the depot (0)
+           (seed)       - Seed of the random points
+           (asymmetric) - Boolean to create an asymmetric matrix (default = False)
+
+    OUTPUT: (matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+    """
+    random_state = np.random.RandomState(seed)
+    points = random_state.uniform(0,100,(n,2))
+    matrix = np.sqrt(((points[:,None,:] - points[None,:,:])**2).sum(axis=2))
+    if asymmetric:
+        matrix = matrix + random_state.uniform(0,30,(n,n))
+        np.fill_diagonal(matrix,0)
+    return GA.GenerateMatrix(a_matrix = matrix)
+
+
+def BenchmarkLS(sizes = (50,100,300),seed = 0):
+    """
+    FUNCTION: BenchmarkLS
+
+    DESCRIPTION:  This function compares the running time of LSFast, LSFastVectorized and LSFastIncremental on random tours of several sizes
+    and checks that the three engines return the same tour and cost. On asymmetric matrices (asymmetric = True) LSFastIncremental runs LSFastVectorized,
+    so only LSFast and LSFastVectorized are compared.
+
+    INPUT: (sizes) - Number of nodes of each instance
+           (seed)  - Seed of the instances and tours
+
+    OUTPUT: (results) - List of (size, asymmetric, time LSFast, time LSFastVectorized, time LSFastIncremental or None)
+    """
+    results = []
+    for n in sizes:
+        for asymmetric in (False,True):
+            matrix = RandomMatrix(n,seed,asymmetric)
+            random.seed(seed)
+            tour = GA.FirstTourCreation(matrix)
+            cost = GA.CostCalculation(tour,matrix)
+
+            time_start = tm.time()
+            tour_py,cost_py = opt2.LSFast(tour,cost,matrix,None,asymmetric)
+            time_py = tm.time() - time_start
+
+            time_start = tm.time()
+            tour_np,cost_np = opt2.LSFastVectorized(tour,cost,np.array(matrix),None,asymmetric)
+            time_np = tm.time() - time_start
+
+            if tour_py != tour_np or cost_py != cost_np:
+                raise ValueError("The LS engines returned different tours!")
+
+            if asymmetric:
+                print "n =",n,"asymmetric: True LSFast:",round(time_py,2),"(s) LSFastVectorized:",round(time_np,2),"(s) speedup:",round(time_py/time_np,1)
+                results.append((n,asymmetric,time_py,time_np,None))
+                continue
+
+            time_start = tm.time()
+            tour_inc,cost_inc = opt2.LSFastIncremental(tour,cost,np.array(matrix))
+            time_inc = tm.time() - time_start
+
+            if tour_py != tour_inc or cost_py != cost_inc:
+                raise ValueError("The LS engines returned different tours!")
+
+            print "n =",n,"asymmetric: False LSFast:",round(time_py,2),"(s) LSFastVectorized:",round(time_np,2),"(s) speedup:",round(time_py/time_np,1),"LSFastIncremental:",round(time_inc,2),"(s) speedup:",round(time_py/time_inc,1)
+            results.append((n,asymmetric,time_py,time_np,time_inc))
+    return results
+
+
+def BenchmarkTwoOpt(sizes = (50,100,300),seed = 0,neighbours = None):
+    """
+    FUNCTION: BenchmarkTwoOpt
+
+    DESCRIPTION:  This function compares the best improvement 2-opt (TwoOptFast) and the first improvement 2-opt with don't-look bits (TwoOptFirst)
+    on random tours: time, final cost, moves evaluated and moves evaluated per CPU second.
+
+    INPUT: (sizes)      - Number of nodes of each instance
+           (seed)       - Seed of the instances and tours
+           (neighbours) - Number of candidates of each node, or None for the full neighbourhood
+
+    OUTPUT: (results) - List of (size, name, time, cost, moves evaluated)
+    """
+    results = []
+    for n in sizes:
+        matrix = RandomMatrix(n,seed)
+        candidate_lists = None
+        if neighbours is not None:
+            candidate_lists = candidates.CandidateLists(matrix,neighbours)
+        random.seed(seed)
+        tour = GA.FirstTourCreation(matrix)
+        for name,search in (('TwoOptFast',opt2.TwoOptFast),('TwoOptFirst',opt2.TwoOptFirst)):
+            stats = {}
+            time_start = tm.clock()
+            new_tour,new_cost = search(tour,matrix,candidate_lists,stats)
+            time_cpu = tm.clock() - time_start
+            print "n =",n,name,"time:",round(time_cpu,2),"(s) cost:",new_cost,"evaluated:",stats['evaluated'],"applied:",stats['applied'],"evaluated per second:",int(stats['evaluated']/max(time_cpu,1e-6))
+            results.append((n,name,time_cpu,new_cost,stats['evaluated']))
+    return results
+
+
+def BenchmarkLK(sizes = (50,100,200),seed = 0,neighbours = 8,max_depth = 10):
+    """
+    FUNCTION: BenchmarkLK
+
+    DESCRIPTION:  This function compares, on the same random tours, the local search of the current mutation (LSFast followed by ThreeOptFast)
+    with the LK-style search LinKernighan: time, final cost and cost reduction per second.
+
+    INPUT: (sizes)      - Number of nodes of each instance
+           (seed)       - Seed of the instances and tours
+           (neighbours) - Number of candidates of each node used by LinKernighan
+           (max_depth)  - Maximum number of steps of each LK chain
+
+    OUTPUT: (results) - List of (size, name, time, cost)
+    """
+    results = []
+    for n in sizes:
+        matrix = RandomMatrix(n,seed)
+        candidate_lists = candidates.CandidateLists(matrix,neighbours)
+        random.seed(seed)
+        tour = GA.FirstTourCreation(matrix)
+        cost = GA.CostCalculation(tour,matrix)
+
+        time_start = tm.clock()
+        new_tour,new_cost = opt2.LSFast(tour,cost,matrix)
+        new_tour,new_cost = opt3.ThreeOptFast(new_tour,matrix)
+        time_ls = tm.clock() - time_start
+
+        time_start = tm.clock()
+        lk_tour,lk_cost = lk.LinKernighan(tour,matrix,candidate_lists,max_depth)
+        time_lk = tm.clock() - time_start
+
+        for name,time_cpu,final_cost in (('LSFast+ThreeOptFast',time_ls,new_cost),('LinKernighan',time_lk,lk_cost)):
+            print "n =",n,name,"time:",round(time_cpu,2),"(s) cost:",round(final_cost,2),"reduction per second:",round((cost-final_cost)/max(time_cpu,1e-6),1)
+            results.append((n,name,time_cpu,final_cost))
+    return results
+
+
+if __name__ == '__main__':
+    BenchmarkLS()
+    BenchmarkTwoOpt()
+    BenchmarkLK()
+
+
+def CheckIslandError(seed = 0):
+    """
+    FUNCTION: CheckIslandError
+
+    DESCRIPTION:  This function checks that IslandGA raises the error of a failing island instead of waiting for it:
+    the islands of a 4-node matrix can not form a population of 10 distinct tours.
+
+    INPUT: (seed) - Seed of the instance
+
+    OUTPUT: (error) - Message of the error raised by IslandGA.
+    """
+    matrix = RandomMatrix(4,seed)
+    try:
+        islands.IslandGA(matrix,10,islands = 2,epochs = 2)
+    except ValueError as error:
+        print "IslandGA raised:", str(error).splitlines()[0]
+        return str(error)
+    raise ValueError("IslandGA did not raise the error of the islands!")
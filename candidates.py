@@ -0,0 +1,129 @@
+import numpy as np
+
+# number of nodes from which the drivers give candidate lists to the mutation
+LARGE_INSTANCE = 100
+
+
+def CandidateLists(cost_matrix,k = 8):
+    """
+    FUNCTION: CandidateLists
+
+    DESCRIPTION:  This function builds the candidate lists of a cost matrix: for every node, its k nearest nodes sorted by the cost of moving from the node to them.
+    Improving moves almost always connect a node to one of its few nearest neighbours, so the local searches can restrict their moves to candidate edges.
+    The lists are built once per cost matrix (e.g. the output of GenerateMatrix) and reused by every local search call.
+
+    INPUT: (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (k)           - Number of candidates of each node (default = 8)
+
+    OUTPUT: (candidates) - List where candidates[u] is the list of the k nearest nodes of node u.
+    """
+    matrix = np.array(cost_matrix,dtype='float64')
+    n = len(matrix)
+    k = min(k,n-1)
+    np.fill_diagonal(matrix,np.inf)
+    nearest = np.argpartition(matrix,k-1,axis=1)[:,:k]
+    order = np.argsort(matrix[np.arange(n)[:,None],nearest],axis=1,kind='mergesort')
+    return nearest[np.arange(n)[:,None],order].tolist()
+
+
+def LargeInstanceLists(cost_matrix,min_size = LARGE_INSTANCE,k = 8):
+    """
+    FUNCTION: LargeInstanceLists
+
+    DESCRIPTION:  This function builds the candidate lists of the large instances only (min_size nodes or more), the smaller instances keep the full LS.
+    The lists restrict the moves of the mutation LS 'LS', 'LSVectorized', '2opt', '2opt-first' and 'LK', and of the 3-opt; 'LSIncremental' ignores them and evaluates all the pairs.
+    The drivers (run_TSP, batchrun) use it so they share the same threshold.
+
+    INPUT: (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (min_size)    - Smallest number of nodes with candidate lists (default = LARGE_INSTANCE)
+           (k)           - Number of candidates of each node (default = 8)
+
+    OUTPUT: (candidates) - Candidate lists given by CandidateLists, or None for a small instance.
+    """
+    if len(cost_matrix) < min_size:
+        return None
+    return CandidateLists(cost_matrix,k)
+
+
+def TourPositions(tour):
+    """
+    FUNCTION: TourPositions
+
+    DESCRIPTION:  This function returns the position of every node in a tour. The depot (0) is at position 0.
+
+    INPUT: (tour)  - List containing the sequence of nodes visited
+
+    OUTPUT: (position) - List where position[u] is the position of node u in the tour.
+    """
+    position = [0]*(len(tour)-1)
+    for p in range(len(tour)-2,-1,-1):
+        position[tour[p]] = p
+    return position
+
+
+def CandidatePairs(tour,candidates,shifts,first = 0,gap = 1):
+    """
+    FUNCTION: CandidatePairs
+
+    DESCRIPTION:  This function lists the pairs of positions (i,j) of a tour whose move adds a candidate edge.
+    For every node u at position a and every candidate v of u at position b, the pairs (a+da,b+db) for (da,db) in shifts are generated
+    (e.g. the 2-opt move on (i,j) adds the edges (i,j) and (i+1,j+1), so the shifts (0,0) and (-1,-1) cover both).
+    The number of pairs is O(n.k) instead of the O(n^2) pairs of a full scan.
+
+    INPUT: (tour)       - List containing the sequence of nodes visited
+           (candidates) - Candidate lists given by CandidateLists
+           (shifts)     - List of (da,db) shifts applied to the positions of the candidate edge
+           (first)      - Smallest position i allowed
+           (gap)        - Smallest difference j-i allowed
+
+    OUTPUT: (pairs) - Sorted list of pairs (i,j), first <= i, i+gap <= j <= len(tour)-2.
+    """
+    last = len(tour)-2
+    position = TourPositions(tour)
+    pairs = set()
+    for a in range(0,last+1):
+        for v in candidates[tour[a]]:
+            if v == 0:
+                ends = (0,last+1)
+            else:
+                ends = (position[v],)
+            for b in ends:
+                for da,db in shifts:
+                    i = a+da
+                    j = b+db
+                    if i > j:
+                        i,j = j,i
+                    if i >= first and j <= last and j-i >= gap:
+                        pairs.add((i,j))
+    return sorted(pairs)
+
+
+def CandidateTriples(tour,candidates):
+    """
+    FUNCTION: CandidateTriples
+
+    DESCRIPTION:  This function lists the triples of positions (i,j,k) of a tour evaluated by the neighbour-restricted 3-opt.
+    For every position i, the positions j and k are taken among the positions b and b-1 of the candidates of the endpoints of the removed edge (i,i+1),
+    so the added edges (i,j), (i,j+1), (i,k), (i+1,k), ... connect close nodes. The number of triples is O(n.k^2) instead of O(n^3).
+
+    INPUT: (tour)       - List containing the sequence of nodes visited
+           (candidates) - Candidate lists given by CandidateLists
+
+    OUTPUT: (triples) - Sorted list of triples (i,j,k), 0 <= i, i+2 <= j, j+2 <= k <= len(tour)-2.
+    """
+    last = len(tour)-2
+    position = TourPositions(tour)
+    triples = set()
+    for i in range(0,last-3):
+        near = set()
+        for u in (tour[i],tour[i+1]):
+            for v in candidates[u]:
+                b = position[v] if v != 0 else last+1
+                near.add(b)
+                near.add(b-1)
+        near = sorted(p for p in near if i+2 <= p <= last)
+        for a in range(0,len(near)):
+            for c in range(a+1,len(near)):
+                if near[c] >= near[a]+2:
+                    triples.add((i,near[a],near[c]))
+    return sorted(triples)
@@ -1,105 +1,238 @@
 import random
 import numpy as np
-import networkx as nx
 
 def NN(A):
     """Nearest neighbor algorithm.
     A is an NxN array indicating distance between N locations
-    start is the index of the starting location
-    Returns the path and cost of the found solution
+    The tour starts at the depot (0), see NNBatch
+    Returns the tour.
     """
-    A = np.array(A)
-    path = [0]
-    cost = 0
-    N = A.shape[0]
-    mask = np.ones(N, dtype=bool)  # boolean values indicating which 
-                                   # locations have not been visited
-    mask[0] = False
-
-    for i in range(N-1):
-        last = path[-1]
-        next_ind = np.argmin(A[last][mask]) # find minimum of remaining locations
-        next_loc = np.arange(N)[mask][next_ind] # convert to original location
-        path.append(next_loc)
-        mask[next_loc] = False
-        cost += A[last, next_loc]
-        
+    return NNBatch(A,[0])[0].tolist()
 
-    return path+[0]
+def NNBatch(A,starts = None):
+    """Multi-start nearest neighbor algorithm.
+    One tour is built from each start node, all at once: on every step the rows of the
+    last nodes of the tours are gathered from the matrix, the visited nodes are masked
+    and the argmin of each row gives the next node (ties to the lowest node, as NN).
+    Each tour is then rotated to start and end at the depot (0).
+    A is an NxN array indicating distance between N locations
+    starts are the start nodes (default None, all the nodes)
+    Returns the np.array of the tours, one per row.
+    """
+    A = np.asarray(A,dtype='float64')
+    N = A.shape[0]
+    if starts is None:
+        starts = np.arange(N)
+    starts = np.asarray(starts,dtype='int64')
+    m = len(starts)
+    rows = np.arange(m)
+    
+    paths = np.zeros((m,N),dtype='int64')
+    paths[:,0] = starts
+    visited = np.zeros((m,N),dtype=bool)   # locations visited by each tour
+    visited[rows,starts] = True
+    for i in range(1,N):
+        distances = A[paths[:,i-1]]
+        distances[visited] = np.inf
+        paths[:,i] = np.argmin(distances,axis=1)
+        visited[rows,paths[:,i]] = True
+    
+    depot = np.argmin(paths,axis=1)   # position of the depot (0) in each path
+    tours = np.zeros((m,N+1),dtype='int64')
+    tours[:,:-1] = paths[rows[:,None],(depot[:,None]+np.arange(N)) % N]
+    return tours
 
 def InsertionCost(matrix,i,k,j):
     return matrix[i][k] + matrix[k][j] - matrix[i][j]
     
-def RandomInsertion(matrix):
-    n = len(matrix)
-    nodes = set(range(0,n))
+INSERTION_RULES = ('random','nearest','farthest','cheapest')
+
+def Insertion(matrix,rule = 'random',start = None):
+    """Insertion heuristics: random, nearest, farthest and cheapest insertion.
+    The tour starts at [0,start,0] and grows by one node per step: a random node, the node
+    nearest to (or farthest from) the tour, or the node with the cheapest insertion.
+    Every node keeps its best insertion (cost and tail of the tour edge) in arrays.
+    After an insertion the arrays are updated for the two new edges in one NumPy expression,
+    and only the nodes whose best edge was removed are evaluated again over all the edges.
+    A is an NxN array indicating distance between N locations
+    start is the first client (default None, a random client)
+    Returns the tour.
+    """
+    if rule not in INSERTION_RULES:
+        raise ValueError("Unknown insertion rule: "+str(rule))
+    A = np.asarray(matrix,dtype='float64')
+    AT = np.ascontiguousarray(A.T)   # columns of A as rows, A[:,j] == AT[j]
+    n = A.shape[0]
+    if start is None:
+        start = random.randint(1,n-1)
+    
+    succ = np.zeros(n,dtype='int64')   # successor of each node of the tour
+    succ[0] = start
+    succ[start] = 0
+    tails = [0,start]
+    remaining = np.ones(n,dtype=bool)
+    remaining[0] = False
+    remaining[start] = False
     
-    start_node = random.randint(1,n-1)
-    tour =[0,start_node,0]
+    # best insertion of each node between tail and succ[tail], and distance to the tour
+    best_cost = A[0] + AT[start] - A[0,start]
+    best_tail = np.zeros(n,dtype='int64')
+    cost = A[start] + AT[0] - A[start,0]
+    best_tail[cost < best_cost] = start
+    best_cost = np.minimum(best_cost,cost)
+    distance = np.minimum(A[0],A[start])
     
-    while (len(tour) < n+1):
-        best_cost = np.Inf
-        tour_set  = set(tour)
-        remaining_nodes = nodes - tour_set
-        k = random.choice(list(remaining_nodes))
+    for step in range(0,n-2):
+        nodes = np.flatnonzero(remaining)
+        if rule == 'random':
+            k = random.choice(nodes.tolist())
+        elif rule == 'nearest':
+            k = nodes[np.argmin(distance[nodes])]
+        elif rule == 'farthest':
+            k = nodes[np.argmax(distance[nodes])]
+        else:
+            k = nodes[np.argmin(best_cost[nodes])]
+        a = best_tail[k]
+        b = succ[a]
+        succ[a] = k
+        succ[k] = b
+        tails.append(k)
+        remaining[k] = False
+        distance = np.minimum(distance,A[k])
+        
+        # the edge (a,b) is replaced by (a,k) and (k,b)
+        stale = np.flatnonzero(remaining & (best_tail == a))
+        for tail,head in ((a,k),(k,b)):
+            cost = A[tail] + AT[head] - A[tail,head]
+            best_tail[cost < best_cost] = tail
+            best_cost = np.minimum(best_cost,cost)
+        if len(stale) > 0:
+            edge_tails = np.array(tails)
+            edge_heads = succ[edge_tails]
+            costs = A[edge_tails[:,None],stale] + AT[edge_heads[:,None],stale] - A[edge_tails,edge_heads][:,None]
+            best = np.argmin(costs,axis=0)
+            best_tail[stale] = edge_tails[best]
+            best_cost[stale] = costs[best,np.arange(len(stale))]
+    
+    tour = [0]
+    node = int(succ[0])
+    while node != 0:
+        tour.append(node)
+        node = int(succ[node])
+    return tour+[0]
 
-        for i in range(0,len(tour)-1):
-                j=i+1
-                
-                cost = InsertionCost(matrix,tour[i],k,tour[j])
-                if cost < best_cost:
-                    best_cost = cost
-                    start = i
-                    end = j
-        tour = tour[:start+1]+[k]+tour[end:]        
-    return tour       
+def RandomInsertion(matrix):
+    return Insertion(matrix,'random')       
     
+def Find(parent,u):
+    """Root of the route of node u in the union-find parent list (path halving)."""
+    while parent[u] != u:
+        parent[u] = parent[parent[u]]
+        u = parent[u]
+    return u
+
 def ClarkeWright(matrix):
-    n = len(matrix)
-#    print "size", n
-    depot = 0
+    """Clarke and Wright savings algorithm.
+    The savings s(i,j) = A[0,i] + A[0,j] - A[i,j] of all pairs of clients are computed
+    with NumPy and sorted once (argsort). The pairs are merged in one pass, from the
+    largest saving: (i,j) joins two routes when i and j are endpoints (degree < 2) of
+    different routes (union-find), until a single route visits all clients.
+    The route is closed at the depot in its cheapest direction.
+    Returns the tour.
+    """
+    A = np.asarray(matrix,dtype='float64')
+    n = A.shape[0]
+    if n <= 2:
+        return list(range(0,n))+[0]
+    
+    first,second = np.triu_indices(n-1,1)
+    first = first+1
+    second = second+1
+    savings = A[0,first] + A[0,second] - A[first,second]
+    order = np.argsort(-savings,kind='mergesort')
+    
+    parent = list(range(0,n))
+    degree = [0]*n
+    links = [[] for node in range(0,n)]
+    merges = 0
+    for i,j in zip(first[order].tolist(),second[order].tolist()):
+        if degree[i] < 2 and degree[j] < 2:
+            root_i = Find(parent,i)
+            root_j = Find(parent,j)
+            if root_i != root_j:
+                parent[root_i] = root_j
+                degree[i] += 1
+                degree[j] += 1
+                links[i].append(j)
+                links[j].append(i)
+                merges += 1
+                if merges == n-2:
+                    break
+    
+    # walk the route from one of its endpoints
+    previous = 0
+    node = degree.index(1,1)
+    tour = [0]
+    while node != 0:
+        tour.append(node)
+        following = 0
+        for linked in links[node]:
+            if linked != previous:
+                following = linked
+        previous,node = node,following
+    tour.append(0)
     
-    tours = [] 
-    for node in range(1,n):
-        tours.append([node,depot,node])
-#    print "tours", tours  
-    savings=[]
+    reverse = tour[::-1]
+    if A[tour[:-1],tour[1:]].sum() > A[reverse[:-1],reverse[1:]].sum():
+        return reverse
+    return tour
     
-    for i in range(0,n-1):
-        for j in range(i+1,n):
-                saving = matrix[0][i] + matrix[0][j] - matrix[i][j]
-                savings.append((saving,i,j))
-                     
-    savings = sorted(savings,reverse=True)           
-#    print savings           
-    new_tour =[]
-    while True:
-        for save,i,j in savings:
-            if new_tour == []:
-                tour_1 = tours[i-1]
-                tour_2 = tours[j-1]
-                new_tour = tour_1[1:]+tour_2[:-1]
-                
-#                print new_tour
-            elif new_tour[-2] == j and i not in new_tour:
-                 new_tour = new_tour[:-1]+tours[i-1][:-1]
-#                 print new_tour
-            elif new_tour[1] == j and i not in new_tour:
-                 new_tour = tours[i-1][1:]+new_tour[1:]         
-#                 print new_tour
-            elif new_tour[-2] == i and j not in new_tour:
-                 new_tour = new_tour[:-1]+tours[j-1][:-1]
-#                 print new_tour
-            elif new_tour[1] == i and j not in new_tour:
-                 new_tour = tours[j-1][1:]+new_tour[1:]
-#                 print new_tour
-        if len(new_tour) >= n+1:break        
-#    print len(new_tour) 
-#    print len(set(new_tour))            
-    return new_tour
+def MST(A):
+    """Prim's algorithm on a dense (symmetric) matrix, O(N^2) without graph objects.
+    A is an NxN array indicating distance between N locations
+    The tree grows from the depot (0): each step adds the closest node out of the tree
+    and updates the distance of the other nodes to the tree with its row.
+    Returns the list of the parent of each node in the tree (the parent of 0 is 0).
+    """
+    A = np.asarray(A,dtype='float64')
+    N = A.shape[0]
+    in_tree = np.zeros(N,dtype=bool)
+    in_tree[0] = True
+    parent = np.zeros(N,dtype='int64')
+    distance = A[0].copy()
+    distance[0] = np.inf
+    for i in range(1,N):
+        u = np.argmin(distance)
+        in_tree[u] = True
+        distance[u] = np.inf
+        closer = (A[u] < distance) & ~in_tree
+        parent[closer] = u
+        distance[closer] = A[u][closer]
+    return parent.tolist()
+
+def MSTPreOrder(matrix,symmetrize = None):
+    """Tour of the preorder (depth first) traversal of the minimum spanning tree (MST), from the depot (0).
+    The children of a node are visited from the lowest node.
+    On directed cost matrices the tree is built on the symmetrized matrix (A + A^T)/2,
+    so no arborescence is needed.
+    A is an NxN array indicating distance between N locations
+    symmetrize is a Boolean (default None, only if the matrix is not symmetric)
+    Returns the tour.
+    """
+    A = np.asarray(matrix,dtype='float64')
+    if symmetrize is None:
+        symmetrize = not np.array_equal(A,A.T)
+    if symmetrize:
+        A = (A + A.T)/2.0
+    parent = MST(A)
+    children = [[] for node in parent]
+    for node in range(1,len(parent)):
+        children[parent[node]].append(node)
     
-def MSTPreOrder(matrix):    
-    numpy_matrix = np.array(matrix)
-    G = nx.from_numpy_matrix(numpy_matrix)
-    T = nx.minimum_spanning_tree(G) 
-    return list(nx.dfs_preorder_nodes(T,0))+[0]     
\ No newline at end of file
+    tour = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        tour.append(node)
+        stack.extend(reversed(children[node]))
+    return tour+[0]
@@ -0,0 +1,117 @@
+import random
+import numpy as np
+
+
+def CostCalculation(tour,cost_matrix):
+    """
+    FUNCTION: CostCalculation
+
+    DESCRIPTION:  This fuction calculates the total cost of a route and returns its cost.
+    On a np.array cost matrix the cost is computed by TourCosts, on nested lists by a loop (no conversion of the matrix).
+
+    INPUT: (tour)        - List containing the sequence of nodes visited
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j
+
+    OUTPUT: (tour_cost)  - Total cost of the input tour.
+    """
+    if isinstance(cost_matrix,np.ndarray):
+        return float(TourCosts([tour],cost_matrix)[0])
+    tour_cost = 0
+    for i in range(len(tour)-1):
+        tour_cost = tour_cost + cost_matrix[tour[i]][tour[i+1]]
+    return tour_cost
+
+
+def TourCosts(tours,cost_matrix):
+    """
+    FUNCTION: TourCosts
+
+    DESCRIPTION:  This function calculates the total cost of many tours of the same length at once, with one fancy-indexed sum:
+    the costs of all the edges (tours[:,p],tours[:,p+1]) are gathered from the cost matrix and summed along each tour.
+    The matrix is used with its own dtype: integer (fixed-point) costs are summed exactly in int64, the others in float64.
+
+    INPUT: (tours)       - 2-D array (or list of lists) with one tour per row
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j. A np.array avoids one conversion per call
+
+    OUTPUT: (tour_costs) - np.array with the total cost of each tour.
+    """
+    tours = np.asarray(tours)
+    cost_matrix = np.asarray(cost_matrix)
+    if np.issubdtype(cost_matrix.dtype,np.integer):
+        # fixed-point costs (fixedpoint.FixedPointMatrix) are summed exactly
+        return cost_matrix[tours[:,:-1],tours[:,1:]].sum(axis=1,dtype='int64')
+    return cost_matrix[tours[:,:-1],tours[:,1:]].sum(axis=1,dtype='float64')
+
+
+def RandomTours(count,n):
+    """
+    FUNCTION: RandomTours
+
+    DESCRIPTION:  This function creates count random tours at once: each row is a random permutation of the client's nodes (argsort of random keys)
+    with the depot (0) at first and last positions. The keys are drawn from a generator seeded by the random module, so random.seed keeps runs reproducible.
+
+    INPUT: (count) - Number of tours
+           (n)     - Number of nodes, including the depot (0)
+
+    OUTPUT: (tours) - np.array (count x n+1) with one tour per row.
+    """
+    keys = np.random.RandomState(random.getrandbits(32)).random_sample((count,n-1))
+    tours = np.zeros((count,n+1),dtype='int64')
+    tours[:,1:-1] = np.argsort(keys,axis=1)+1
+    return tours
+
+
+def MatrixStack(matrices):
+    """
+    FUNCTION: MatrixStack
+
+    DESCRIPTION:  This function stacks the cost matrices of several objectives (e.g. distance, speed, load gradient and emissions of one driver) in one 3-D array,
+    to evaluate the tours on all of them with ObjectiveCosts.
+
+    INPUT: (matrices) - List of cost matrices (full) of the same size
+
+    OUTPUT: (stack) - np.array (objective x n x n).
+    """
+    sizes = set(np.shape(matrix) for matrix in matrices)
+    if len(sizes) != 1:
+        raise ValueError("The cost matrices must have the same size!")
+    return np.array([np.asarray(matrix) for matrix in matrices])
+
+
+def ObjectiveCosts(tours,stack):
+    """
+    FUNCTION: ObjectiveCosts
+
+    DESCRIPTION:  This function calculates the total cost of many tours on every objective of a matrix stack with one fancy-indexed sum, as TourCosts:
+    the costs of all the edges of all the tours are gathered from all the matrices at once and summed along each tour.
+
+    INPUT: (tours) - 2-D array (or list of lists) with one tour per row
+           (stack) - Stack of cost matrices given by MatrixStack
+
+    OUTPUT: (objective_costs) - np.array (objective x tours) with the total cost of each tour on each objective.
+    """
+    tours = np.asarray(tours)
+    stack = np.asarray(stack)
+    edges = stack[:,tours[:,:-1],tours[:,1:]]
+    if np.issubdtype(stack.dtype,np.integer):
+        return edges.sum(axis=2,dtype='int64')
+    return edges.sum(axis=2,dtype='float64')
+
+
+def WeightedMatrix(stack,weights):
+    """
+    FUNCTION: WeightedMatrix
+
+    DESCRIPTION:  This function combines the matrices of a stack into the cost matrix of a weighted-sum objective.
+    The cost of a tour is linear in the costs of its edges, so its cost on the weighted matrix is the weighted sum of its ObjectiveCosts,
+    and the GA (GA.main) optimizes the weighted sum on this matrix with the same kernel as a single objective.
+
+    INPUT: (stack)   - Stack of cost matrices given by MatrixStack
+           (weights) - Weight of each objective
+
+    OUTPUT: (matrix) - np.array (n x n) with the weighted sum of the cost matrices.
+    """
+    weights = np.asarray(weights,dtype='float64')
+    if len(weights) != len(stack):
+        raise ValueError("There must be one weight per objective!")
+    return np.tensordot(weights,np.asarray(stack,dtype='float64'),axes=1)
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def EdgeKeys(u,v,symmetric = True):
+    """
+    FUNCTION: EdgeKeys
+
+    DESCRIPTION:  This function gives a pseudo-random 64-bit key to each edge (u,v), mixing the two nodes with the splitmix64 finalizer.
+    For symmetric cost matrices the edge is undirected and (u,v) and (v,u) have the same key.
+
+    INPUT: (u,v)       - Nodes, or np.arrays of nodes, of the edges
+           (symmetric) - Boolean to ignore the direction of the edges (default = True)
+
+    OUTPUT: (keys) - np.array (uint64) with the key of each edge.
+    """
+    u = np.atleast_1d(np.asarray(u,dtype='uint64'))
+    v = np.atleast_1d(np.asarray(v,dtype='uint64'))
+    if symmetric:
+        u,v = np.minimum(u,v),np.maximum(u,v)
+    z = (u << np.uint64(32)) + v + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def TourFingerprints(tours,symmetric = True):
+    """
+    FUNCTION: TourFingerprints
+
+    DESCRIPTION:  This function computes the fingerprint of many tours at once: the sum (modulo 2^64) of the keys of the edges of each tour.
+    The fingerprint depends only on the set of edges, so it is the same for every rotation of the tour and, if symmetric, for the reversed tour.
+    Two different tours have the same fingerprint with probability about 2^-64, whatever their costs.
+
+    INPUT: (tours)     - 2-D array (or list of lists) with one tour per row, starting and ending at the depot (0)
+           (symmetric) - Boolean to ignore the direction of the tours (default = True)
+
+    OUTPUT: (fingerprints) - List with the fingerprint (int) of each tour.
+    """
+    tours = np.asarray(tours)
+    keys = EdgeKeys(tours[:,:-1].ravel(),tours[:,1:].ravel(),symmetric).reshape(len(tours),-1)
+    return [int(key) for key in keys.sum(axis=1,dtype='uint64')]
+
+
+def TourFingerprint(tour,symmetric = True):
+    """
+    FUNCTION: TourFingerprint
+
+    DESCRIPTION:  This function computes the fingerprint of one tour (see TourFingerprints).
+
+    INPUT: (tour)      - List containing the sequence of nodes visited
+           (symmetric) - Boolean to ignore the direction of the tour (default = True)
+
+    OUTPUT: (fingerprint) - Fingerprint (int) of the tour.
+    """
+    return TourFingerprints([tour],symmetric)[0]
+
+
+def UpdateFingerprint(fingerprint,removed,added,symmetric = True):
+    """
+    FUNCTION: UpdateFingerprint
+
+    DESCRIPTION:  This function updates the fingerprint of a tour after a move in O(number of edges changed),
+    removing the keys of the edges removed by the move and adding the keys of the new edges (e.g. 2 and 2 for a 2-opt move, 3 and 3 for an Or-opt move).
+    On a symmetric matrix the reversed paths do not change the fingerprint; otherwise their edges must be listed too.
+
+    INPUT: (fingerprint) - Fingerprint of the tour before the move
+           (removed)     - List of the edges (u,v) removed
+           (added)       - List of the edges (u,v) added
+           (symmetric)   - Boolean to ignore the direction of the edges (default = True)
+
+    OUTPUT: (fingerprint) - Fingerprint of the tour after the move.
+    """
+    mask = (1 << 64) - 1
+    for edges,sign in ((removed,-1),(added,1)):
+        if len(edges) > 0:
+            u,v = zip(*edges)
+            fingerprint = fingerprint + sign*int(EdgeKeys(u,v,symmetric).sum(dtype='uint64'))
+    return fingerprint & mask
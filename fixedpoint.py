@@ -0,0 +1,52 @@
+import numpy as np
+
+# costs are stored in hundredths, the 2 decimals kept by GA.GenerateMatrix
+SCALE = 100
+
+
+def FixedPointMatrix(cost_matrix):
+    """
+    FUNCTION: FixedPointMatrix
+
+    DESCRIPTION:  This function converts a cost matrix to fixed point: every cost is stored as an int32 number of hundredths (half the memory of float64).
+    With integer costs the changes of the moves and the tour costs are exact, so the LS do not need to round them and equal costs are really equal.
+    Use ToCost to convert the costs back.
+
+    INPUT: (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+
+    OUTPUT: (matrix) - np.array (int32) with the costs in hundredths.
+    """
+    matrix = np.asarray(cost_matrix,dtype='float64')
+    scaled = np.sign(matrix)*np.floor(np.abs(matrix).astype(np.longdouble)*SCALE + np.longdouble(0.5))
+    # a tour sums n costs, which must fit in a Python float exactly and in the int64 sums of the cost kernel
+    if np.abs(scaled).max() > np.iinfo('int32').max:
+        raise ValueError("The costs are too large for a fixed-point matrix!")
+    return scaled.astype('int32')
+
+
+def IsFixedPoint(cost_matrix):
+    """
+    FUNCTION: IsFixedPoint
+
+    DESCRIPTION:  This function checks if a cost matrix holds fixed-point (integer) costs, as a np.array or as the nested lists given by tolist().
+
+    INPUT: (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+
+    OUTPUT: True - If the costs are integers. False - Otherwise
+    """
+    if isinstance(cost_matrix,np.ndarray):
+        return np.issubdtype(cost_matrix.dtype,np.integer)
+    return isinstance(cost_matrix[0][0],(int,long,np.integer))
+
+
+def ToCost(value):
+    """
+    FUNCTION: ToCost
+
+    DESCRIPTION:  This function converts a fixed-point cost (hundredths) back to the cost.
+
+    INPUT: (value) - Fixed-point cost
+
+    OUTPUT: (cost) - Cost, rounded to 2 decimals.
+    """
+    return round(value/float(SCALE),2)
@@ -0,0 +1,183 @@
+import random
+import multiprocessing
+import Queue
+import traceback
+import numpy as np
+import time as tm
+import GA
+import population as popl
+
+
+def SharedMatrix(cost_matrix):
+    """
+    FUNCTION: SharedMatrix
+
+    DESCRIPTION:  This function copies a cost matrix once into shared memory (a multiprocessing RawArray), so the worker processes read it without their own copies.
+
+    INPUT: (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j.
+
+    OUTPUT: (shared) - RawArray with the n*n costs, row by row.
+    """
+    matrix = np.asarray(cost_matrix,dtype='float64')
+    shared = multiprocessing.RawArray('d',matrix.size)
+    MatrixView(shared,len(matrix))[:] = matrix
+    return shared
+
+
+def MatrixView(shared,n):
+    """
+    FUNCTION: MatrixView
+
+    DESCRIPTION:  This function gives the n x n np.array view of a shared cost matrix, without copying it.
+
+    INPUT: (shared) - RawArray given by SharedMatrix
+           (n)      - Number of nodes
+
+    OUTPUT: (matrix) - np.array view of the costs.
+    """
+    return np.ctypeslib.as_array(shared).reshape(n,n)
+
+
+def Targets(island,islands,topology):
+    """
+    FUNCTION: Targets
+
+    DESCRIPTION:  This function gives the islands receiving the migrants of an island: the next island for a 'ring', all the other islands for a 'full' topology.
+
+    INPUT: (island)   - Index of the island
+           (islands)  - Number of islands
+           (topology) - 'ring' or 'full'
+
+    OUTPUT: (targets) - List of the target islands.
+    """
+    if topology == 'ring':
+        return [(island+1) % islands]
+    elif topology == 'full':
+        return [other for other in range(0,islands) if other != island]
+    raise ValueError("Unknown topology: "+str(topology))
+
+
+def Island(island,shared,n,pop_size,epochs,migrants,mutation_rate,num_of_success,number_of_unsuccess,ls,asymmetric,inboxes,targets,sources,results,seed):
+    """
+    FUNCTION: Island
+
+    DESCRIPTION:  This function evolves the population of one island (worker process). After every epoch (ImproveGA and GA, as one restart of GA.main),
+    the best migrants of the island are sent to its target islands and the migrants of its source islands replace the worst members they beat, if they are not duplicates.
+    The final best member and the statistics of the island are put in the results queue.
+    If the island fails, its target islands receive empty migrant lists for the epochs left, so they do not wait for it,
+    the migrants still coming from its source islands are read and the error record (None,{'island': island,'error': traceback}) is put in the results queue.
+
+    INPUT: (island)     - Index of the island
+           (shared)     - Shared cost matrix given by SharedMatrix
+           (n)          - Number of nodes
+           (pop_size)   - Number of distinct individual in the population
+           (epochs)     - Number of epochs (restarts) between migrations
+           (migrants)   - Number of best members sent to each target island
+           (mutation_rate),(num_of_success),(number_of_unsuccess),(ls),(asymmetric) - Parameters of GA.GA
+           (inboxes)    - List with the migration queue of every island
+           (targets)    - List of the islands receiving the migrants
+           (sources)    - Number of islands sending migrants to this island
+           (results)    - Queue of the results
+           (seed)       - Seed of the random generator of the island
+
+    OUTPUT: None.
+    """
+    time_start = tm.time()
+    sent = 0
+    received = 0
+    try:
+        random.seed(seed)
+        matrix = MatrixView(shared,n)
+        stats = {'island': island,'best': [],'accepted': 0}
+        pop = GA.InitialPopulation(pop_size,matrix,matrix,asymmetric)
+        for epoch in range(0,epochs):
+            if epoch > 0:
+                pop = GA.ImproveGA(pop,matrix,matrix,asymmetric)
+            pop = GA.GA(matrix,pop_size,pop,mutation_rate,num_of_success,number_of_unsuccess,None,ls,asymmetric,None,None,stats,matrix)
+            stats['best'].append(GA.GetFittest(pop)[2])
+            if epoch == epochs-1:
+                break
+            for target in targets:
+                inboxes[target].put(pop[:migrants])
+            sent += 1
+            index = popl.PopulationIndex(pop,not asymmetric)
+            for source in range(0,sources):
+                received += 1
+                for entry in inboxes[island].get():
+                    fingerprint = popl.Fingerprint(index,entry[1])
+                    if entry[2] < popl.Worst(pop)[2] and not popl.Contains(index,fingerprint):
+                        popl.Replace(pop,index,len(pop)-1,entry,fingerprint)
+                        stats['accepted'] += 1
+        stats['time'] = tm.time() - time_start
+        results.put((GA.GetFittest(pop),stats))
+    except Exception:
+        for epoch in range(sent,epochs-1):
+            for target in targets:
+                inboxes[target].put([])
+        # the migrants still sent to this island are read, so the other processes can flush their queues and exit
+        for message in range(received,sources*(epochs-1)):
+            inboxes[island].get()
+        results.put((None,{'island': island,'error': traceback.format_exc()}))
+
+
+def IslandGA(matrix,pop_size,islands = 4,epochs = 5,migrants = 2,topology = 'ring',mutation_rate = 0.005,num_of_success = 500,number_of_unsuccess = 250,ls = 'LSIncremental',asymmetric = None,seed = 0):
+    """
+    FUNCTION: IslandGA
+
+    DESCRIPTION:  This function runs the island model of the Genetic Algorithm: one worker process per island evolves its own population (see Island),
+    with migration of the best tours after every epoch over a ring or full topology. The cost matrix is shared by all the workers (SharedMatrix),
+    so the LS of the mutation should work on np.arrays ('LSIncremental' or 'LSVectorized').
+
+    INPUT: (matrix)     - Cost matrix (full) with the associated cost of moving from node i to node j.
+           (pop_size)   - Number of distinct individual in each population
+           (islands)    - Number of islands (worker processes) (default = 4)
+           (epochs)     - Number of epochs of each island (default = 5)
+           (migrants)   - Number of best members sent to each target island after every epoch (default = 2)
+           (topology)   - Migration topology, 'ring' or 'full' (default = 'ring')
+           (mutation_rate) - Probability of having a mutation in the best offspring
+           (num_of_success)  - max number of sucessful offspring of each epoch
+           (number_of_unsuccess)  - max number of unsucessful offspring of each epoch
+           (ls)         - LS used by the mutation (default = 'LSIncremental')
+           (asymmetric) - Boolean to compute exact LS changes on asymmetric cost matrices (default = None, checked once with GA.IsSymmetric)
+           (seed)       - Seed of the islands, island i uses seed+i (default = 0)
+
+    OUTPUT: (fittest)       - [fit,tour,cost] of the best solution found by all the islands
+            (island_stats)  - List with the statistics of each island: best cost after each epoch ('best'), migrants accepted ('accepted') and time ('time')
+            (total_time)    - Running time of the algorithm
+    """
+    time_start = tm.time()
+    if asymmetric is None:
+        asymmetric = not GA.IsSymmetric(matrix)
+    GA.CheckLS(ls,asymmetric)
+    n = len(matrix)
+    shared = SharedMatrix(matrix)
+    inboxes = [multiprocessing.Queue() for island in range(0,islands)]
+    results = multiprocessing.Queue()
+    sources = len(Targets(0,islands,topology)) if islands > 1 else 0
+
+    workers = []
+    for island in range(0,islands):
+        targets = Targets(island,islands,topology) if islands > 1 else []
+        worker = multiprocessing.Process(target = Island,args = (island,shared,n,pop_size,epochs,migrants,mutation_rate,num_of_success,number_of_unsuccess,ls,asymmetric,inboxes,targets,sources,results,seed+island))
+        worker.start()
+        workers.append(worker)
+
+    island_results = []
+    while len(island_results) < islands:
+        try:
+            island_results.append(results.get(timeout = 1))
+        except Queue.Empty:
+            # a worker killed without its result (e.g. out of memory) would leave the queue empty forever
+            if any(worker.exitcode not in (None,0) for worker in workers):
+                for worker in workers:
+                    worker.terminate()
+                raise ValueError("An island process died without its result!")
+    for worker in workers:
+        worker.join()
+    errors = [result[1] for result in island_results if result[0] is None]
+    if errors:
+        raise ValueError("Island "+str(errors[0]['island'])+" failed:\n"+errors[0]['error'])
+
+    island_results = sorted(island_results,key = lambda result: result[1]['island'])
+    fittest = min((result[0] for result in island_results),key = lambda entry: entry[2])
+    return fittest,[result[1] for result in island_results],tm.time() - time_start
@@ -0,0 +1,154 @@
+import collections
+import candidates as cand
+import tourarray as ta
+import costs
+import fixedpoint as fxp
+
+
+def LKStep(order,position,t1,t2,t3):
+    """
+    FUNCTION: LKStep
+
+    DESCRIPTION:  This function applies in place one step of the LK chain: with t2 next to t1 and t4 the node before t3 (in the direction going from t1 to t2),
+    the edges (t1,t2) and (t4,t3) are replaced by (t2,t3) and (t4,t1), reversing the path t2..t4 (shorter side, symmetric cost matrices only).
+    The same call with t2 and t4 swapped undoes the step.
+
+    INPUT: (order)    - List with the cycle of nodes
+           (position) - List where position[u] is the index of node u in order
+           (t1)       - Fixed node of the chain
+           (t2)       - Node next to t1, end of the open edge
+           (t3)       - Node joined to t2
+
+    OUTPUT: (t4) - Node next to t1 after the step.
+    """
+    if ta.Next(order,position,t1) == t2:
+        t4 = ta.Prev(order,position,t3)
+        ta.Reverse(order,position,t2,t4,True)
+    else:
+        t4 = ta.Next(order,position,t3)
+        ta.Reverse(order,position,t4,t2,True)
+    return t4
+
+
+def LKChain(order,position,dist,candidates,t1,t2,max_depth,stats):
+    """
+    FUNCTION: LKChain
+
+    DESCRIPTION:  This function searches an improving LK chain (variable-depth search) starting with the removal of the edge (t1,t2).
+    At each level the open edge (t1,t2) is extended by joining t2 to a candidate t3 and removing the edge (t4,t3), and the tour is closed with the edge (t4,t1).
+    Following the LK gain criterion, a candidate is only tried while the partial gain stays positive, and edges added by the chain are never removed again.
+    All the candidates of t2 are tried at the first level and the best one (largest d(t4,t3)-d(t2,t3)) at the deeper levels, up to max_depth levels.
+    The steps after the level with the best closed gain are undone, or the whole chain if no level improves the tour.
+
+    INPUT: (order)      - List with the cycle of nodes
+           (position)   - List where position[u] is the index of node u in order
+           (dist)       - Cost matrix (full) with the associated cost of moving from node i to node j
+           (candidates) - Candidate lists given by candidates.CandidateLists
+           (t1)         - Fixed node of the chain
+           (t2)         - Tour neighbour of t1
+           (max_depth)  - Maximum number of steps of the chain
+           (stats)      - Dictionary where the number of moves evaluated ('evaluated') is accumulated
+
+    OUTPUT: (gain)  - Cost reduction of the tour (0 if the chain failed).
+            (nodes) - List with the endpoints of the changed edges.
+    """
+    def Options(t2,g,added):
+        options = []
+        forward = ta.Next(order,position,t1) == t2
+        after = ta.Next(order,position,t2) if forward else ta.Prev(order,position,t2)
+        for t3 in candidates[t2]:
+            if t3 == t1 or t3 == after:
+                continue
+            stats['evaluated'] = stats.get('evaluated',0) + 1
+            g1 = g - dist[t2][t3]
+            if (g1 if exact else round(g1,2)) <= 0:
+                break
+            t4 = ta.Prev(order,position,t3) if forward else ta.Next(order,position,t3)
+            if (t4,t3) in added or (t3,t4) in added:
+                continue
+            options.append((g1 + dist[t4][t3],t3,t4))
+        options.sort(reverse = True)
+        return options
+
+    exact = fxp.IsFixedPoint(dist)
+    start = t2
+    for first in Options(start,dist[t1][start],set()):
+        g,t3,t4 = first
+        t2 = start
+        steps = [(t2,t3)]
+        added = set([(t2,t3)])
+        best_gain = g - dist[t4][t1]
+        best_depth = 1
+        LKStep(order,position,t1,t2,t3)
+        t2 = t4
+        while len(steps) < max_depth:
+            options = Options(t2,g,added)
+            if not options:
+                break
+            g,t3,t4 = options[0]
+            LKStep(order,position,t1,t2,t3)
+            steps.append((t2,t3))
+            added.add((t2,t3))
+            t2 = t4
+            if g - dist[t4][t1] > best_gain:
+                best_gain = g - dist[t4][t1]
+                best_depth = len(steps)
+        if (best_gain if exact else round(best_gain,2)) <= 0:
+            best_depth = 0
+        # undo the steps after the best level, from the last one
+        while len(steps) > best_depth:
+            t2_step,t3_step = steps.pop()
+            LKStep(order,position,t1,t2,t3_step)
+            t2 = t2_step
+        if best_depth > 0:
+            nodes = [t1,t2]
+            for t2_step,t3_step in steps:
+                nodes.extend((t2_step,t3_step))
+            return best_gain,nodes
+    return 0,[]
+
+
+def LinKernighan(tour,dist,candidates = None,max_depth = 10,stats = None):
+    """
+    FUNCTION: LinKernighan
+
+    DESCRIPTION:  This function applies an LK-style variable-depth local search (see LKChain) with don't-look bits, as TwoOptFirst.
+    A queue holds the "dirty" nodes, initially all of them. For a node t1 taken from the queue, chains removing each of its two tour edges are tried;
+    if one improves the tour, the endpoints of the changed edges are queued again. The algorithm stops when the queue is empty.
+    Each chain is a sequence of 2-opt moves restricted to candidate edges, so deep moves (3-opt, Or-opt and beyond) are found at the cost of a few 2-opt evaluations.
+    The tour is kept as a tourarray and the paths are reversed on the shorter side, which assumes a symmetric cost matrix (GA.CheckLS rejects 'LK' on asymmetric ones).
+
+    INPUT: (tour)       - List containing the sequence of nodes visited
+           (dist)       - Cost matrix (full) with the associated cost of moving from node i to node j
+           (candidates) - Candidate lists given by candidates.CandidateLists (default = None, built for this call with 8 candidates)
+           (max_depth)  - Maximum number of steps of each chain (default = 10)
+           (stats)      - Dictionary where the number of moves evaluated ('evaluated') and improving chains applied ('applied') are accumulated (default = None)
+
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
+    if candidates is None:
+        candidates = cand.CandidateLists(dist)
+    if stats is None:
+        stats = {}
+    order,position = ta.TourArray(tour)
+    queue = collections.deque(order)
+    queued = [True]*len(order)
+    applied = 0
+
+    while queue:
+        t1 = queue.popleft()
+        queued[t1] = False
+        for t2 in (ta.Next(order,position,t1),ta.Prev(order,position,t1)):
+            gain,nodes = LKChain(order,position,dist,candidates,t1,t2,max_depth,stats)
+            if gain > 0:
+                for node in nodes:
+                    if not queued[node]:
+                        queue.append(node)
+                        queued[node] = True
+                applied += 1
+                break
+
+    tour = ta.TourList(order,position)
+    stats['applied'] = stats.get('applied',0) + applied
+    return tour,costs.CostCalculation(tour,dist)
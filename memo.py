@@ -0,0 +1,57 @@
+import collections
+
+
+def MemoCache(capacity = 1000):
+    """
+    FUNCTION: MemoCache
+
+    DESCRIPTION:  This function creates a bounded memo cache with least recently used (LRU) eviction.
+    The entries are kept in an OrderedDict from the least to the most recently used, so lookups, insertions and evictions are O(1).
+    The cache counts its hits, misses and evictions, to choose its capacity.
+
+    INPUT: (capacity) - Maximum number of entries (default = 1000)
+
+    OUTPUT: (cache) - Dictionary with the 'capacity', the 'entries' and the counters 'hits', 'misses' and 'evictions'.
+    """
+    return {'capacity': capacity,'entries': collections.OrderedDict(),'hits': 0,'misses': 0,'evictions': 0}
+
+
+def Lookup(cache,key):
+    """
+    FUNCTION: Lookup
+
+    DESCRIPTION:  This function returns the value stored for a key and marks it as the most recently used, counting a hit or a miss.
+
+    INPUT: (cache) - Cache given by MemoCache
+           (key)   - Hashable key
+
+    OUTPUT: (value) - Value stored, or None if the key is not in the cache.
+    """
+    entries = cache['entries']
+    value = entries.pop(key,None)
+    if value is None:
+        cache['misses'] += 1
+        return None
+    entries[key] = value
+    cache['hits'] += 1
+    return value
+
+
+def Store(cache,key,value):
+    """
+    FUNCTION: Store
+
+    DESCRIPTION:  This function stores a value for a key as the most recently used entry, evicting the least recently used entries above the capacity.
+
+    INPUT: (cache) - Cache given by MemoCache
+           (key)   - Hashable key
+           (value) - Value stored (not None)
+
+    OUTPUT: None.
+    """
+    entries = cache['entries']
+    entries.pop(key,None)
+    entries[key] = value
+    while len(entries) > cache['capacity']:
+        entries.popitem(last = False)
+        cache['evictions'] += 1
@@ -0,0 +1,102 @@
+import numpy as np
+import time as tm
+
+
+def OrOptDeltas(D,forward,backward,length,reverse):
+    """
+    FUNCTION: OrOptDeltas
+
+    DESCRIPTION:  This function evaluates in one NumPy pass the cost change of moving every segment of a given length to every insertion edge of the tour.
+    The segment in positions s..e (e = s+length-1) is removed, its neighbours s-1 and e+1 are connected, and it is inserted between positions p and p+1.
+    Each change is computed in O(1): the six end edges are read from the permuted matrix and, if the segment is reversed, the change of its inner path
+    comes from the prefix costs of the tour (exact on asymmetric matrices).
+
+    INPUT: (D)                - Cost matrix permuted by the tour, D[a][b] = cost_matrix[tour[a]][tour[b]]
+           (forward,backward) - np.arrays with the prefix costs of the tour (see tourarray.PathCosts)
+           (length)           - Number of nodes of the segments
+           (reverse)          - Boolean to insert the segments reversed
+
+    OUTPUT: (change) - np.array (segment start s-1 x insertion position p) with the cost change of each move, np.inf for the moves that are not valid.
+    """
+    size = D.shape[0] #length of the tour
+    s = np.arange(1,size-length)[:,None]
+    e = s+length-1
+    p = np.arange(0,size-1)[None,:]
+    if reverse:
+        first = e
+        last = s
+    else:
+        first = s
+        last = e
+    change = D[s-1,e+1] + D[p,first] + D[last,p+1] - D[s-1,s] - D[e,e+1] - D[p,p+1]
+    if reverse:
+        change = change + ((backward[e]-backward[s]) - (forward[e]-forward[s]))
+    change[(p > s-2) & (p < e+1)] = np.inf
+    return change
+
+
+def OrOpt(tour,tour_cost,cost_matrix,max_length = 3,stats = None):
+    """
+    FUNCTION: OrOpt
+
+    DESCRIPTION:  This function applies the Or-opt local search (best improvement): segments of 1 to max_length consecutive nodes are moved,
+    with or without reversal, to the best insertion point of the tour. The changes of all the moves are computed by OrOptDeltas, O(1) each,
+    and the best one is applied in place. The algorithm stops when no move improves the tour.
+
+    INPUT: (tour)        - List containing the sequence of nodes visited
+           (tour_cost)   - Cost of the input tour
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j. A np.array avoids one conversion per call
+           (max_length)  - Maximum number of nodes of the moved segments (default = 3)
+           (stats)       - Dictionary where the number of calls ('oropt_calls'), the time ('oropt_time'), the gain ('oropt_gain')
+                           and the number of moves applied ('oropt_applied') are accumulated (default = None)
+
+    OUTPUT: (tour)      - New tour recreated.
+            (tour_cost) - Cost of the new tour.
+    """
+    time_start = tm.time()
+    tour = list(tour)
+    size = len(tour) #length of the tour
+    cost_matrix = np.asarray(cost_matrix,dtype='float64')
+    start_cost = tour_cost
+    applied = 0
+
+    while (True):
+        nodes = np.array(tour)
+        D = cost_matrix[nodes[:,None],nodes[None,:]]
+        steps = np.arange(size-1)
+        forward = np.concatenate(([0.0],np.cumsum(D[steps,steps+1])))
+        backward = np.concatenate(([0.0],np.cumsum(D[steps+1,steps])))
+
+        minchange = 0
+        for length in range(1,min(max_length,size-3)+1):
+            for reverse in ((False,) if length == 1 else (False,True)):
+                change = OrOptDeltas(D,forward,backward,length,reverse)
+                index = np.argmin(change)
+                if minchange > round(change.flat[index],2):
+                    minchange = float(change.flat[index])
+                    row,minp = divmod(index,change.shape[1])
+                    mins = row+1
+                    minlength = length
+                    minreverse = reverse
+        if (minchange >= 0): break
+
+        # move the segment mins..mine after position minp, shifting the nodes in between
+        mine = mins+minlength-1
+        segment = tour[mins:mine+1]
+        if minreverse:
+            segment.reverse()
+        if minp > mine:
+            tour[mins:minp-minlength+1] = tour[mine+1:minp+1]
+            tour[minp-minlength+1:minp+1] = segment
+        else:
+            tour[minp+1+minlength:mine+1] = tour[minp+1:mins]
+            tour[minp+1:minp+1+minlength] = segment
+        tour_cost = tour_cost + minchange
+        applied += 1
+
+    if stats is not None:
+        stats['oropt_calls'] = stats.get('oropt_calls',0) + 1
+        stats['oropt_time'] = stats.get('oropt_time',0) + tm.time() - time_start
+        stats['oropt_gain'] = stats.get('oropt_gain',0) + start_cost - tour_cost
+        stats['oropt_applied'] = stats.get('oropt_applied',0) + applied
+    return tour,tour_cost
@@ -0,0 +1,219 @@
+import numpy as np
+import fingerprint as fp
+
+
+def TourDtype(n):
+    """
+    FUNCTION: TourDtype
+
+    DESCRIPTION:  This function gives the smallest integer type holding the nodes of the tours: int16 up to 32767 nodes, int32 above.
+
+    INPUT: (n) - Number of nodes, including the depot (0)
+
+    OUTPUT: (dtype) - 'int16' or 'int32'.
+    """
+    if n <= np.iinfo('int16').max:
+        return 'int16'
+    return 'int32'
+
+
+def ArrayPopulation(capacity,n,symmetric = True,cost_dtype = 'float64'):
+    """
+    FUNCTION: ArrayPopulation
+
+    DESCRIPTION:  This function creates an empty array-backed GA population, the compact alternative to the list of (fitness,tour,cost) of the population module.
+    The tours are the rows of one preallocated 2-D array (TourDtype), with the costs and the fingerprints (fingerprint.TourFingerprints) in parallel arrays,
+    so a member costs 2 or 4 bytes per node instead of a Python list of ints, and the fitness (equal to the cost) is not stored.
+    A member keeps its row for its whole life: replacing a member overwrites the row in place, and only the array 'order' of the rows sorted by cost is shifted.
+
+    INPUT: (capacity)   - Maximum number of members
+           (n)          - Number of nodes, including the depot (0)
+           (symmetric)  - Boolean to consider a tour and its reversal as duplicates (default = True)
+           (cost_dtype) - Type of the costs, 'int64' for fixed-point matrices (default = 'float64')
+
+    OUTPUT: (apop) - Dictionary with the arrays 'tours', 'costs', 'fingerprints' and 'order', the number of members 'size',
+                     the flag 'symmetric' and the dictionary 'counts' of the fingerprints (as in population.PopulationIndex).
+    """
+    return {'tours': np.zeros((capacity,n+1),dtype=TourDtype(n)),
+            'costs': np.zeros(capacity,dtype=cost_dtype),
+            'fingerprints': np.zeros(capacity,dtype='uint64'),
+            'order': np.zeros(capacity,dtype='int32'),
+            'size': 0,
+            'symmetric': symmetric,
+            'counts': {}}
+
+
+def FromEntries(pop,symmetric = True,capacity = None,cost_dtype = 'float64'):
+    """
+    FUNCTION: FromEntries
+
+    DESCRIPTION:  This function copies a GA population given as a list of (fitness,tour,cost) into an array-backed population, computing all the fingerprints in one call.
+
+    INPUT: (pop)        - GA population, list of (fitness,tour,cost)
+           (symmetric)  - Boolean to consider a tour and its reversal as duplicates (default = True)
+           (capacity)   - Maximum number of members (default = None, the size of pop)
+           (cost_dtype) - Type of the costs (default = 'float64')
+
+    OUTPUT: (apop) - Array-backed population given by ArrayPopulation.
+    """
+    if capacity is None:
+        capacity = len(pop)
+    apop = ArrayPopulation(capacity,len(pop[0][1])-1,symmetric,cost_dtype)
+    tours = [tour for fitness,tour,cost in pop]
+    for entry,fingerprint in zip(pop,fp.TourFingerprints(tours,symmetric)):
+        Insert(apop,entry[1],entry[2],fingerprint)
+    return apop
+
+
+def Entries(apop):
+    """
+    FUNCTION: Entries
+
+    DESCRIPTION:  This function converts an array-backed population back to the sorted list of (fitness,tour,cost) used by the population module.
+
+    INPUT: (apop) - Array-backed population given by ArrayPopulation
+
+    OUTPUT: (pop) - Sorted GA population, list of (fitness,tour,cost).
+    """
+    rows = apop['order'][:apop['size']]
+    member_costs = apop['costs'][rows].tolist()
+    return [(cost,tour,cost) for tour,cost in zip(apop['tours'][rows].tolist(),member_costs)]
+
+
+def Fingerprint(apop,tour):
+    """
+    FUNCTION: Fingerprint
+
+    DESCRIPTION:  This function computes the fingerprint of a tour as stored in the population.
+
+    INPUT: (apop) - Array-backed population given by ArrayPopulation
+           (tour) - List containing the sequence of nodes visited
+
+    OUTPUT: (fingerprint) - Fingerprint of the tour.
+    """
+    return fp.TourFingerprint(tour,apop['symmetric'])
+
+
+def Contains(apop,fingerprint):
+    """
+    FUNCTION: Contains
+
+    DESCRIPTION:  This function checks in O(1) if a member with the given fingerprint is in the population.
+
+    INPUT: (apop)        - Array-backed population given by ArrayPopulation
+           (fingerprint) - Lookup fingerprint (see Fingerprint)
+
+    OUTPUT: True - If a member has this fingerprint. False - Otherwise
+    """
+    return apop['counts'].get(fingerprint,0) > 0
+
+
+def Insert(apop,tour,cost,fingerprint = None):
+    """
+    FUNCTION: Insert
+
+    DESCRIPTION:  This function writes a new member in the next free row and inserts the row at its sorted position in the order (bisection).
+
+    INPUT: (apop)        - Array-backed population, modified in place
+           (tour)        - List containing the sequence of nodes visited
+           (cost)        - Cost of the tour
+           (fingerprint) - Fingerprint of the tour (default = None, computed here)
+
+    OUTPUT: (k) - Rank of the new member.
+    """
+    size = apop['size']
+    if size == len(apop['order']):
+        raise ValueError("The population is full!")
+    if fingerprint is None:
+        fingerprint = Fingerprint(apop,tour)
+    order = apop['order']
+    k = int(np.searchsorted(apop['costs'][order[:size]],cost,side='right'))
+    order[k+1:size+1] = order[k:size].copy()
+    order[k] = size
+    apop['tours'][size] = tour
+    apop['costs'][size] = cost
+    apop['fingerprints'][size] = fingerprint
+    apop['counts'][fingerprint] = apop['counts'].get(fingerprint,0) + 1
+    apop['size'] = size + 1
+    return k
+
+
+def Replace(apop,k,tour,cost,fingerprint = None):
+    """
+    FUNCTION: Replace
+
+    DESCRIPTION:  This function replaces the member of rank k by a new member: its row is overwritten in place and moved to its sorted position in the order.
+
+    INPUT: (apop)        - Array-backed population, modified in place
+           (k)           - Rank of the member removed
+           (tour)        - List containing the sequence of nodes visited
+           (cost)        - Cost of the tour
+           (fingerprint) - Fingerprint of the tour (default = None, computed here)
+
+    OUTPUT: (k) - Rank of the new member.
+    """
+    if fingerprint is None:
+        fingerprint = Fingerprint(apop,tour)
+    order = apop['order']
+    size = apop['size']
+    row = order[k]
+    counts = apop['counts']
+    old_fingerprint = int(apop['fingerprints'][row])
+    counts[old_fingerprint] -= 1
+    if counts[old_fingerprint] == 0:
+        del counts[old_fingerprint]
+
+    position = int(np.searchsorted(apop['costs'][order[:size]],cost,side='right'))
+    if position > k:
+        position = position-1
+        order[k:position] = order[k+1:position+1].copy()
+    else:
+        order[position+1:k+1] = order[position:k].copy()
+    order[position] = row
+    apop['tours'][row] = tour
+    apop['costs'][row] = cost
+    apop['fingerprints'][row] = fingerprint
+    counts[fingerprint] = counts.get(fingerprint,0) + 1
+    return position
+
+
+def Tour(apop,k):
+    """
+    FUNCTION: Tour
+
+    DESCRIPTION:  This function returns the tour of the member of rank k, as a view of its row (not a copy).
+
+    INPUT: (apop) - Array-backed population given by ArrayPopulation
+           (k)    - Rank of the member
+
+    OUTPUT: (tour) - np.array with the sequence of nodes visited.
+    """
+    return apop['tours'][apop['order'][k]]
+
+
+def Cost(apop,k):
+    """
+    FUNCTION: Cost
+
+    DESCRIPTION:  This function returns the cost of the member of rank k.
+
+    INPUT: (apop) - Array-backed population given by ArrayPopulation
+           (k)    - Rank of the member
+
+    OUTPUT: (cost) - Cost of the tour.
+    """
+    return apop['costs'][apop['order'][k]].item()
+
+
+def Best(apop):
+    """
+    FUNCTION: Best
+
+    DESCRIPTION:  This function returns the member with the lowest cost, as an entry of the population module.
+
+    INPUT: (apop) - Array-backed population given by ArrayPopulation
+
+    OUTPUT: ([fit,tour,cost]) - First member of the population.
+    """
+    cost = Cost(apop,0)
+    return (cost,Tour(apop,0).tolist(),cost)
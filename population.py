@@ -0,0 +1,139 @@
+import bisect
+import random
+import fingerprint as fp
+
+
+def PopulationIndex(pop,symmetric = True):
+    """
+    FUNCTION: PopulationIndex
+
+    DESCRIPTION:  This function creates the hash index of a GA population: the number of members with each tour fingerprint (fingerprint.TourFingerprints).
+    The population itself stays a list of (fitness,tour,cost) sorted by fitness; the functions of this module keep both in sync,
+    so duplicate checks are O(1) and replacements O(log n) searches, without sorting the whole population again.
+    Duplicates are the same tour up to rotation (and reversal if symmetric), independently of the costs.
+
+    INPUT: (pop)       - Sorted GA population, list of (fitness,tour,cost)
+           (symmetric) - Boolean to consider a tour and its reversal as duplicates (default = True)
+
+    OUTPUT: (index) - Dictionary with the flag 'symmetric' and the dictionary 'counts', where counts[fingerprint] is the number of members with that fingerprint.
+    """
+    index = {'symmetric': symmetric,'counts': {}}
+    if len(pop) > 0:
+        for fingerprint in fp.TourFingerprints([tour for fitness,tour,cost in pop],symmetric):
+            index['counts'][fingerprint] = index['counts'].get(fingerprint,0) + 1
+    return index
+
+
+def Fingerprint(index,tour):
+    """
+    FUNCTION: Fingerprint
+
+    DESCRIPTION:  This function computes the fingerprint of a tour as stored in the index.
+
+    INPUT: (index) - Index given by PopulationIndex
+           (tour)  - List containing the sequence of nodes visited
+
+    OUTPUT: (fingerprint) - Fingerprint of the tour.
+    """
+    return fp.TourFingerprint(tour,index['symmetric'])
+
+
+def Contains(index,fingerprint):
+    """
+    FUNCTION: Contains
+
+    DESCRIPTION:  This function checks in O(1) if a member with the given fingerprint is in the population.
+
+    INPUT: (index)       - Index given by PopulationIndex
+           (fingerprint) - Lookup fingerprint (see Fingerprint)
+
+    OUTPUT: True - If a member has this fingerprint. False - Otherwise
+    """
+    return index['counts'].get(fingerprint,0) > 0
+
+
+def Insert(pop,index,entry,fingerprint = None):
+    """
+    FUNCTION: Insert
+
+    DESCRIPTION:  This function inserts a member in the population at its sorted position (bisection) and updates the index.
+
+    INPUT: (pop)         - Sorted GA population, modified in place
+           (index)       - Index given by PopulationIndex, modified in place
+           (entry)       - New member (fitness,tour,cost)
+           (fingerprint) - Fingerprint of the new tour (default = None, computed here)
+
+    OUTPUT: None.
+    """
+    if fingerprint is None:
+        fingerprint = Fingerprint(index,entry[1])
+    bisect.insort(pop,entry)
+    index['counts'][fingerprint] = index['counts'].get(fingerprint,0) + 1
+
+
+def Replace(pop,index,k,entry,fingerprint = None):
+    """
+    FUNCTION: Replace
+
+    DESCRIPTION:  This function replaces the member of rank k by a new member, keeping the population sorted and the index updated.
+
+    INPUT: (pop)         - Sorted GA population, modified in place
+           (index)       - Index given by PopulationIndex, modified in place
+           (k)           - Rank of the member removed
+           (entry)       - New member (fitness,tour,cost)
+           (fingerprint) - Fingerprint of the new tour (default = None, computed here)
+
+    OUTPUT: (old) - The member removed.
+    """
+    old = pop.pop(k)
+    counts = index['counts']
+    old_fingerprint = Fingerprint(index,old[1])
+    counts[old_fingerprint] -= 1
+    if counts[old_fingerprint] == 0:
+        del counts[old_fingerprint]
+    Insert(pop,index,entry,fingerprint)
+    return old
+
+
+def Best(pop):
+    """
+    FUNCTION: Best
+
+    DESCRIPTION:  This function returns the member with the lowest cost.
+
+    INPUT: (pop) - Sorted GA population
+
+    OUTPUT: First member of the population.
+    """
+    return pop[0]
+
+
+def Worst(pop):
+    """
+    FUNCTION: Worst
+
+    DESCRIPTION:  This function returns the member with the highest cost.
+
+    INPUT: (pop) - Sorted GA population
+
+    OUTPUT: Last member of the population.
+    """
+    return pop[-1]
+
+
+def RandomRank(pop,lo = 0,hi = None):
+    """
+    FUNCTION: RandomRank
+
+    DESCRIPTION:  This function draws in O(1) a random rank between lo and hi (included), e.g. the whole population for the parent selection
+    or its worse half for the replacement.
+
+    INPUT: (pop) - Sorted GA population
+           (lo)  - Lowest rank (default = 0, the best member)
+           (hi)  - Highest rank (default = None, the worst member)
+
+    OUTPUT: (k) - Rank drawn.
+    """
+    if hi is None:
+        hi = len(pop)-1
+    return random.randint(lo,hi)
@@ -1,4 +1,6 @@
 import GA
+import candidates
+import costs
 
 if __name__ == '__main__':
 
@@ -12,16 +14,15 @@ if __name__ == '__main__':
     for driver in drivers:
         results = []
         print "driver", driver
-        MR = GA.GenerateMatrix(path+str(driver)+"_distance.txt")
-        if len(MR) < 100:
-            results.append(GA.main(MR,30,3,3,0.1,1000,1000))
-            MS = GA.GenerateMatrix(path+str(driver)+"_matrix_with_speed.txt")
-            results.append(GA.main(MS,30,3,3,0.1,1000,1000))
-            MG = GA.GenerateMatrix(path+str(driver)+"_matrix_with_load_gradient.txt")
-            results.append(GA.main(MG,30,3,3,0.1,1000,1000))
-            ME =GA.GenerateMatrix(path+str(driver)+"_EU_2020.txt")
+        MR = GA.GenerateMatrix(path+str(driver)+"_distance.txt",cache = True)
+        MS = GA.GenerateMatrix(path+str(driver)+"_matrix_with_speed.txt",cache = True)
+        MG = GA.GenerateMatrix(path+str(driver)+"_matrix_with_load_gradient.txt",cache = True)
+        ME =GA.GenerateMatrix(path+str(driver)+"_EU_2020.txt",cache = True)
+        stack = costs.MatrixStack((MR,ME,MS,MG))
+        for M in (MR,MS,MG):
+            results.append(GA.main(M,30,3,3,0.1,1000,1000,candidates = candidates.LargeInstanceLists(M)))
         print results
-        table = []
-        for sol in results:
-            table.append((GA.CostCalculation(sol[0][1],MR),GA.CostCalculation(sol[0][1],ME),GA.CostCalculation(sol[0][1],MS),GA.CostCalculation(sol[0][1],MG)))
+        # costs of the best tours on MR, ME, MS and MG, in one call
+        objective_costs = costs.ObjectiveCosts([sol[0][1] for sol in results],stack)
+        table = [tuple(round(cost,2) for cost in row) for row in objective_costs.T.tolist()]
         final.append(table)
@@ -0,0 +1,143 @@
+def TourArray(tour):
+    """
+    FUNCTION: TourArray
+
+    DESCRIPTION:  This function creates the array representation of a tour used by TwoOptFirst and the LK search (lk.py) to apply their reversals in place.
+    The tour is kept as a cycle (order) of the n nodes, without the depot repeated at the end, together with the position of every node in the cycle.
+    Moves update both lists in place, so no new tour is built for each applied move.
+
+    INPUT: (tour)  - List containing the sequence of nodes visited, starting and ending at the depot (0)
+
+    OUTPUT: (order)    - List with the cycle of nodes
+            (position) - List where position[u] is the index of node u in order
+    """
+    order = list(tour[:-1])
+    position = [0]*len(order)
+    for p in range(0,len(order)):
+        position[order[p]] = p
+    return order,position
+
+
+def TourList(order,position):
+    """
+    FUNCTION: TourList
+
+    DESCRIPTION:  This function converts the array representation of a tour back to a list starting and ending at the depot (0).
+
+    INPUT: (order)    - List with the cycle of nodes
+           (position) - List where position[u] is the index of node u in order
+
+    OUTPUT: (tour) - List containing the sequence of nodes visited.
+    """
+    start = position[0]
+    return order[start:] + order[:start] + [0]
+
+
+def Next(order,position,u):
+    """
+    FUNCTION: Next
+
+    DESCRIPTION:  This function returns the node visited after node u.
+
+    INPUT: (order)    - List with the cycle of nodes
+           (position) - List where position[u] is the index of node u in order
+           (u)        - Node
+
+    OUTPUT: Successor of u in the cycle.
+    """
+    p = position[u]+1
+    if p == len(order):
+        p = 0
+    return order[p]
+
+
+def Prev(order,position,u):
+    """
+    FUNCTION: Prev
+
+    DESCRIPTION:  This function returns the node visited before node u.
+
+    INPUT: (order)    - List with the cycle of nodes
+           (position) - List where position[u] is the index of node u in order
+           (u)        - Node
+
+    OUTPUT: Predecessor of u in the cycle.
+    """
+    return order[position[u]-1]
+
+
+def Reverse(order,position,a,b,shorter = False):
+    """
+    FUNCTION: Reverse
+
+    DESCRIPTION:  This function reverses in place the path going forward from node a to node b, swapping the nodes from both ends.
+    The cost is O(length of the path). If shorter is True and the path is longer than half the cycle, the complementary path is reversed instead:
+    the resulting cycle is the same, read in the opposite direction, so this is only valid for symmetric cost matrices.
+
+    INPUT: (order)    - List with the cycle of nodes
+           (position) - List where position[u] is the index of node u in order
+           (a)        - First node of the path
+           (b)        - Last node of the path
+           (shorter)  - Boolean to reverse the shorter side of the cycle (default = False)
+
+    OUTPUT: None.
+    """
+    n = len(order)
+    i = position[a]
+    j = position[b]
+    length = (j-i) % n + 1
+    if shorter and 2*length > n:
+        i,j = (j+1) % n,(i-1) % n
+        length = n-length
+    for step in range(0,length//2):
+        u = order[i]
+        v = order[j]
+        order[i] = v
+        position[v] = i
+        order[j] = u
+        position[u] = j
+        i += 1
+        if i == n:
+            i = 0
+        j -= 1
+        if j < 0:
+            j = n-1
+
+
+def PathCosts(tour,cost_matrix):
+    """
+    FUNCTION: PathCosts
+
+    DESCRIPTION:  This function computes the prefix costs of a tour in both directions: forward[p] is the cost of the path from position 0 to position p
+    and backward[p] is the cost of the same path travelled in the opposite direction. With these prefix sums, the cost change of reversing the positions i to j
+    on an asymmetric cost matrix is known in O(1): (backward[j]-backward[i]) - (forward[j]-forward[i]).
+
+    INPUT: (tour)        - List containing the sequence of nodes visited
+           (cost_matrix) - Cost matrix (full) with the associated cost of moving from node i to node j
+
+    OUTPUT: (forward,backward) - Lists of len(tour) prefix costs.
+    """
+    forward = [0]*len(tour)
+    backward = [0]*len(tour)
+    UpdatePathCosts(forward,backward,tour,cost_matrix,1)
+    return forward,backward
+
+
+def UpdatePathCosts(forward,backward,tour,cost_matrix,lo):
+    """
+    FUNCTION: UpdatePathCosts
+
+    DESCRIPTION:  This function refreshes the prefix costs given by PathCosts after a move that rewrote the tour from position lo.
+    The prefixes from position lo to the end are summed again in order, the same additions as the np.cumsum of 2opt.LSPathCosts,
+    so the changes of the LS engines are bitwise identical (shifting the tail by the change of the move would round differently).
+
+    INPUT: (forward,backward) - Prefix costs given by PathCosts, modified in place
+           (tour)             - List containing the sequence of nodes visited, after the move
+           (cost_matrix)      - Cost matrix (full) with the associated cost of moving from node i to node j
+           (lo)               - First position rewritten by the move
+
+    OUTPUT: None.
+    """
+    for p in range(max(lo,1),len(tour)):
+        forward[p] = forward[p-1] + cost_matrix[tour[p-1]][tour[p]]
+        backward[p] = backward[p-1] + cost_matrix[tour[p]][tour[p-1]]